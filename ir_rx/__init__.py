@@ -8,7 +8,9 @@
 
 from machine import Timer, Pin
 from array import array
-from utime import ticks_us
+from utime import ticks_us, ticks_ms, ticks_diff
+import gc
+from . import timers
 
 # from micropython import alloc_emergency_exception_buf
 # alloc_emergency_exception_buf(100)
@@ -21,7 +23,8 @@ from utime import ticks_us
 
 
 class IR_RX:
-    Timer_id = -1  # Software timer but enable override
+    Timer_id = -1  # Software timer. n: hardware timer n. None: free hardware timer if any
+    rp2_dma = False  # RP2: time edges with PIO and DMA
     # Result/error codes
     # Repeat button code
     REPEAT = -1
@@ -32,6 +35,14 @@ class IR_RX:
     OVERRUN = -5
     BADDATA = -6
     BADADDR = -7
+    # Key events
+    PRESS = 0
+    HOLD = 1
+    RELEASE = 2
+    _ctrl_state = False  # True if ctrl holds key state (MCE) rather than data
+    _trepeat = 120  # Nominal interval (ms) between frames of a held key
+    _nominal = ()  # Nominal mark and space widths (μs): set by subclasses
+    _group = None  # Set by IR_GROUP while it instantiates its receivers
 
     def __init__(self, pin, nedges, tblock, callback, *args):  # Optional args for callback
         self._pin = pin
@@ -41,12 +52,39 @@ class IR_RX:
         self.args = args
         self._errf = lambda _: None
         self.verbose = False
+        self.hold_gc = False  # Disable GC from first edge until decode is complete
+        self.hold_ms = 150  # Max interval (ms) between frames of a held key
+        # Time from decode to release event: next frame is due after
+        # _trepeat - tblock ms.
+        self.release_ms = max(self._trepeat - tblock, 0) + 20
+        self._x = 0  # Bi-phase decoder state
+        self._bit = 0
+        self._keyf = None
+        self._kdown = False  # Key state
+        self._kdata = 0
+        self._kaddr = 0
+        self._kctrl = 0
+        self._kcount = 0
+        self._kt0 = 0  # ticks_ms() at press
+        self._klast = 0  # and at most recent frame
 
         self._times = array("i", (0 for _ in range(nedges + 1)))  # +1 for overrun
-        pin.irq(handler=self._cb_pin, trigger=(Pin.IRQ_FALLING | Pin.IRQ_RISING))
         self.edge = 0
-        self.tim = Timer(self.Timer_id)  # Defaul is sofware timer
+        g = IR_RX._group
+        self._group = g
+        # Default is sofware timer. Receivers in a group share the group's timer.
+        self.tim = timers.get(self.Timer_id) if g is None else g._proxy(self)
         self.cb = self.decode
+        self._cbrel = self._release_timeout  # Bound method: avoid allocation
+        self._cap = None
+        if self.rp2_dma:  # Edge times are written to ._times by DMA
+            from .rp2_dma import RP2_CAPTURE
+
+            self._cap = RP2_CAPTURE(pin, self._times, self._cb_first)
+            self.cb = self._cb_dma
+            self._cap.arm()
+        else:
+            pin.irq(handler=self._cb_pin, trigger=(Pin.IRQ_FALLING | Pin.IRQ_RISING))
 
     # Pin interrupt. Save time of each edge for later decode.
     def _cb_pin(self, line):
@@ -55,19 +93,156 @@ class IR_RX:
         if self.edge <= self._nedges:  # Allow 1 extra pulse to record overrun
             if not self.edge:  # First edge received
                 self.tim.init(period=self._tblock, mode=Timer.ONE_SHOT, callback=self.cb)
+                if self.hold_gc:
+                    gc.disable()
             self._times[self.edge] = t
             self.edge += 1
 
+    # RP2 DMA: PIO interrupt on first edge of a burst.
+    def _cb_first(self, _):
+        self.tim.init(period=self._tblock, mode=Timer.ONE_SHOT, callback=self.cb)
+        if self.hold_gc:
+            gc.disable()
+
+    # RP2 DMA: block timer has timed out.
+    def _cb_dma(self, t):
+        self.edge = self._cap.count()
+        self.decode(t)
+
     def do_callback(self, cmd, addr, ext, thresh=0):
         self.edge = 0
+        if self._cap is not None:
+            self._cap.arm()
+        if self.hold_gc:
+            gc.enable()
+        if self._group is None:
+            self._deliver(cmd, addr, ext, thresh)
+        else:  # The group delivers a single result from all its receivers
+            self._group._collect(cmd, addr, ext, thresh)
+
+    # Update key state and run user callback or error function.
+    def _deliver(self, cmd, addr, ext, thresh):
+        if self._keyf is not None:
+            if cmd >= self.REPEAT:
+                self._key(cmd, addr, ext)
+            if self._kdown:  # Next burst's first edge will cancel this
+                self.tim.init(period=self.release_ms, mode=Timer.ONE_SHOT, callback=self._cbrel)
         if cmd >= thresh:
-            self.callback(cmd, addr, ext, *self.args)
+            # Calling with *args allocates: avoid this in common cases.
+            a = self.args
+            n = len(a)
+            if not n:
+                self.callback(cmd, addr, ext)
+            elif n == 1:
+                self.callback(cmd, addr, ext, a[0])
+            elif n == 2:
+                self.callback(cmd, addr, ext, a[0], a[1])
+            else:
+                self.callback(cmd, addr, ext, *a)
         else:
             self._errf(cmd)
 
+    # Bit assembly shared by the protocol classes. Values are returned in chunks
+    # of up to 16 bits: longer values would be long ints, allocating on each bit.
+
+    # Pulse distance or pulse width coding. Return nbits, LSB first, from the
+    # intervals starting at edges x, x + 2, x + 4... An interval longer than
+    # thresh μs is a 1.
+    def _pulses(self, x, nbits, thresh):
+        times = self._times
+        v = 0
+        bit = 1
+        for x in range(x, x + 2 * nbits, 2):
+            if ticks_diff(times[x + 1], times[x]) > thresh:
+                v |= bit
+            bit <<= 1
+        return v
+
+    # Bi-phase (Manchester) coding. ._x is the edge at the centre of the last
+    # bit decoded and ._bit its value. Return the following nbits. An interval
+    # between lo and hi μs is valid: if < split it is half a bit period.
+    def _biphase(self, nbits, lo, split, hi, msb=True):
+        times = self._times
+        nedges = self.edge
+        x = self._x
+        bit = self._bit
+        v = 0
+        for n in range(nbits):
+            # -1 convert count to index, -1 because we look ahead
+            if x > nedges - 2:
+                raise RuntimeError(self.BADBLOCK)
+            width = ticks_diff(times[x + 1], times[x])
+            if not lo < width < hi:
+                self.verbose and print('Bad block Width', width, 'x', x)
+                raise RuntimeError(self.BADBLOCK)
+            short = width < split
+            if not short:
+                bit ^= 1
+            if msb:
+                v = (v << 1) | bit
+            else:
+                v |= bit << n
+            x += 1 + short
+        self._x = x
+        self._bit = bit
+        return v
+
     def error_function(self, func):
         self._errf = func
 
+    def key_function(self, func):
+        self._keyf = func
+
+    # Key state. A frame repeating the held key's data, addr and ctrl (or an
+    # NEC repeat code) within hold_ms of the last is a hold: anything else is a
+    # new press. RC5/RC6 flip the ctrl bit on each press so a fresh press of
+    # the same key is recognised. Ints only: this does not allocate.
+    def _key(self, cmd, addr, ctrl):
+        now = ticks_ms()
+        if self._kdown and ticks_diff(now, self._klast) > self.hold_ms:
+            self._release()
+        if cmd == self.REPEAT:
+            if not self._kdown:
+                return  # Repeat code without a preceding press
+            cmd = self._kdata
+            addr = self._kaddr
+            ctrl = self._kctrl
+        state = 1
+        if self._ctrl_state:  # MCE: 0 first frame, 1 held, 2 released
+            state = ctrl
+            ctrl = 0
+        if self._kdown and state and cmd == self._kdata and addr == self._kaddr and ctrl == self._kctrl:
+            self._klast = now
+            if state == 2:
+                self._release()
+            else:
+                self._kcount += 1
+                self._keyf(self.HOLD, cmd, addr, self._kcount, ticks_diff(now, self._kt0))
+            return
+        if self._kdown:
+            self._release()
+        self._kdown = True
+        self._kdata = cmd
+        self._kaddr = addr
+        self._kctrl = ctrl
+        self._kcount = 0
+        self._kt0 = now
+        self._klast = now
+        self._keyf(self.PRESS, cmd, addr, 0, 0)
+        if state == 2:
+            self._release()
+
+    def _release_timeout(self, _):
+        if self._kdown and not self.edge:
+            self._release()
+
+    def _release(self):
+        self._kdown = False
+        self._keyf(self.RELEASE, self._kdata, self._kaddr, self._kcount, ticks_diff(self._klast, self._kt0))
+
     def close(self):
-        self._pin.irq(handler=None)
-        self.tim.deinit()
+        if self._cap is None:
+            self._pin.irq(handler=None)
+        else:
+            self._cap.close()
+        timers.release(self.tim)
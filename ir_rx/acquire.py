@@ -7,14 +7,23 @@
 
 from machine import Pin, freq
 from sys import platform
+from array import array
 
-from utime import sleep_ms, ticks_us, ticks_diff
+from utime import sleep_ms, ticks_ms, ticks_us, ticks_diff
 from ir_rx import IR_RX
 
+_STD = (30000, 33000, 36000, 38000, 40000, 56000)  # Common carrier frequencies (Hz)
+_CMASK = 0x3FFFFFFF  # Pyboard carrier capture: timer counter range
+_SPACE = 100  # μs: a longer interval between edges is an envelope space
 
+
+# Capture a burst. By default only the first frame is kept. If full is True,
+# frames after the first are kept along with the gaps between them, for
+# replay by ir_tx.Player. nedges and twait must then cover the whole burst.
 class IR_GET(IR_RX):
-    def __init__(self, pin, nedges=100, twait=100, display=True):
+    def __init__(self, pin, nedges=100, twait=100, display=True, full=False):
         self.display = display
+        self.full = full
         super().__init__(pin, nedges, twait, lambda *_ : None)
         self.data = None
 
@@ -22,15 +31,21 @@ class IR_GET(IR_RX):
         def near(v, target):
             return target * 0.8 < v < target * 1.2
         lb = self.edge - 1  # Possible length of burst
-        if lb < 3:
-            return  # Noise
+        if lb < 3:  # Noise: reset for next burst
+            self.do_callback(0, 0, 0)
+            return
         burst = []
+        nframes = 1
+        frame = 0  # Length of first frame
         for x in range(lb):
             dt = ticks_diff(self._times[x + 1], self._times[x])
             if x > 0 and dt > 10000:  # Reached gap between repeats
-                break
+                if not self.full:
+                    break
+                nframes += 1
+                frame = frame or x
             burst.append(dt)
-        lb = len(burst)  # Actual length
+        lb = frame or len(burst)  # Length of first frame
         # Duration of pulse train 24892 for RC-5 22205 for RC-6
         duration = ticks_diff(self._times[lb - 1], self._times[0])
 
@@ -38,6 +53,8 @@ class IR_GET(IR_RX):
             for x, e in enumerate(burst):
                 print('{:03d} {:5d}'.format(x, e))
             print()
+            if nframes > 1:
+                print('{} frames. Protocol is that of the first.'.format(nframes))
             # Attempt to determine protocol
             ok = False  # Protocol not yet found
             if near(burst[0], 9000) and lb == 67:
@@ -62,6 +79,9 @@ class IR_GET(IR_RX):
                 if near(duration, 22205) and near(burst[1], 889) and near(burst[2], 444):
                     print('Philips RC-6 mode 0')
                     ok = True
+                elif near(duration, 37000) and near(burst[7], 889):
+                    print('Philips RC-6 mode 6A')
+                    ok = True
 
             if not ok and near(burst[0], 2000) and near(burst[1], 1000):
                 if near(duration, 19000):
@@ -74,8 +94,16 @@ class IR_GET(IR_RX):
                 print('Samsung')
                 ok = True
 
-            if not ok and near(burst[0], 3500) and near(burst[1], 1680):  # Panasonic?
-                print('Unsupported protocol. Panasonic?')
+            if not ok and near(burst[0], 3456) and near(burst[1], 1728) and lb == 99:
+                print('Kaseikyo (Panasonic)')
+                ok = True
+
+            if not ok and near(burst[0], 8400) and near(burst[1], 4200) and lb == 35:
+                print('JVC')
+                ok = True
+
+            if not ok and near(burst[0], 320) and lb == 31:  # Gap precedes 2nd frame
+                print('Sharp or Denon')
                 ok = True
 
             if not ok:
@@ -92,7 +120,149 @@ class IR_GET(IR_RX):
         self.close()
         return self.data
 
-def test():
+
+# Measure the carrier of a remote from a raw photodiode signal (the carrier is
+# present, unlike the output of a receiver chip). The time of each edge is
+# latched by hardware, so interrupt latency does not affect the result. On RP2
+# a PIO state machine times the high and low part of each carrier cycle and DMA
+# stores the counts. On Pyboard a 32 bit timer captures both edges on an input
+# capture channel. Other platforms have no suitable capture hardware: edges
+# timed in software at carrier rates cannot be trusted, so they are refused.
+class CARRIER:
+    # timer: Pyboard (timer, channel) supporting input capture on the pin. The
+    # default suits X4 (PA3).
+    def __init__(self, pin, ncycles=200, active_high=True, timer=(5, 4)):
+        self._pin = pin
+        self._active_high = active_high
+        self.freq = None  # Measured values
+        self.duty = None
+        self._cap = None
+        if platform == 'rp2':
+            from .rp2_dma import RP2_CAPTURE, cycletimer
+            self._buf = array('I', (0 for _ in range(2 * ncycles)))
+            self._cap = RP2_CAPTURE(pin, self._buf, None, cycletimer, freq())
+        elif platform == 'pyboard':
+            from pyb import Timer
+            self._tim = Timer(timer[0], prescaler=0, period=_CMASK)
+            self._ic = self._tim.channel(timer[1], Timer.IC, pin=pin, polarity=Timer.BOTH)
+            self._times = array('i', (0 for _ in range(2 * ncycles + 1)))
+            self._n = 0
+            self._nmax = len(self._times) - 1
+            self._icb = self._cb  # Pre-allocate
+        else:
+            raise OSError('No timer capture on this platform')
+
+    def _cb(self, _):  # Pyboard: record the captured time of an edge
+        n = self._n
+        if n <= self._nmax:
+            self._times[n] = self._ic.capture()
+            self._n = n + 1
+
+    # Wait for a burst. Return (freq, duty) for Player or ir_tx.IR.__init__,
+    # or None if no carrier was found within timeout ms.
+    def measure(self, timeout=10000):
+        t = ticks_ms()
+        if self._cap is None:  # Pyboard
+            self._n = 0
+            # If IR is being received, the first edges may end a cycle.
+            self._skip = self._pin.value() == self._active_high
+            self._ic.callback(self._icb)
+            while self._n <= self._nmax and ticks_diff(ticks_ms(), t) < timeout:
+                sleep_ms(5)
+            self._ic.callback(None)
+            periods, highs = self._cycles(1_000_000 / self._tim.source_freq())
+        else:  # RP2: buffer holds high, low loop counts of each cycle
+            cap = self._cap
+            cap.arm()
+            while cap.count() < len(self._buf) and ticks_diff(ticks_ms(), t) < timeout:
+                sleep_ms(5)
+            cap.sm.active(0)
+            buf = self._buf
+            k = 2_000_000 / freq()  # μs per loop (2 clocks)
+            periods = []
+            highs = []
+            for x in range(0, cap.count() - 1, 2):
+                h = buf[x] + 1.5  # Allow for instructions outside the loops
+                l = buf[x + 1] + 1.5
+                periods.append((h + l) * k)
+                highs.append((h if self._active_high else l) * k)
+        if not self._analyse(periods, highs):
+            return None
+        return self.params()
+
+    # Pyboard: convert captured edge times (k μs per count) to the period and
+    # active (IR on) time of each carrier cycle. Edges alternate, so the edge
+    # following an envelope space starts a cycle, as does the first edge unless
+    # capture started during a burst. A run of cycles between two
+    # spaces is discarded if it contains an interval of a whole period or more:
+    # an edge was missed, so the active and inactive parts may be swapped.
+    def _cycles(self, k):
+        ts = self._times
+        n = self._n
+        dt = [((ts[x + 1] - ts[x]) & _CMASK) * k for x in range(n - 1)]
+        spans = sorted(dt[x] + dt[x + 1] for x in range(n - 2) if dt[x] + dt[x + 1] < _SPACE)
+        if not spans:
+            return [], []
+        p0 = spans[len(spans) // 2]  # Median period
+        periods = []
+        highs = []
+        x = 0
+        skip = self._skip
+        while x < n - 1:
+            y = x  # Run of cycles starts at edge x
+            while y < n - 1 and dt[y] < _SPACE:
+                y += 1
+            if y > x and not skip and max(dt[x:y]) < p0 * 0.9:  # No missed edge
+                for z in range(x, y - 1, 2):
+                    periods.append(dt[z] + dt[z + 1])
+                    highs.append(dt[z])
+            x = y + 1  # Edge after the space starts the next run
+            skip = False
+        return periods, highs
+
+    # Periods are μs between active edges. Those outside the carrier range are
+    # envelope spaces. One lasting n carrier periods is n cycles (missed edges).
+    def _analyse(self, periods, highs):
+        ok = sorted(p for p in periods if 10 < p < 50)  # 20KHz to 100KHz
+        if len(ok) < 10:
+            return False
+        p0 = ok[len(ok) // 2]  # Median period
+        cycles = 0
+        total = 0
+        tc = 0  # Total for complete cycles
+        th = 0  # Of which carrier high
+        for x, p in enumerate(periods):
+            n = round(p / p0)
+            if 1 <= n <= 3 and abs(p - n * p0) < p0 / 4:
+                cycles += n
+                total += p
+                if n == 1:
+                    tc += p
+                    th += highs[x]
+        self.freq = cycles * 1_000_000 / total
+        self.duty = 100 * th / tc if tc else None
+        return True
+
+    # Values for the transmitter: the nearest common frequency if within 3%,
+    # and duty (default 33%) constrained to a sensible range.
+    def params(self):
+        f = round(self.freq, -2)
+        for s in _STD:
+            if abs(self.freq - s) < s * 0.03:
+                f = s
+        d = 33 if self.duty is None else min(max(round(self.duty), 10), 50)
+        return int(f), d
+
+    def close(self):
+        if self._cap is not None:
+            self._cap.close()
+        else:
+            self._ic.callback(None)
+            self._tim.deinit()
+
+
+# If full is True, capture every frame of a burst lasting up to 500ms.
+def test(full=False):
     # Define pin according to platform
     if platform == 'pyboard':
         pin = Pin('X3', Pin.IN)
@@ -103,6 +273,26 @@ def test():
         pin = Pin(23, Pin.IN)
     elif platform == 'rp2':
         pin = Pin(16, Pin.IN)
-    irg = IR_GET(pin)
+    irg = IR_GET(pin, 400, 500, full=True) if full else IR_GET(pin)
     print('Waiting for IR data...')
     return irg.acquire()
+
+# Measure the carrier using a raw photodiode signal
+def carrier_test():
+    if platform == 'pyboard':
+        pin = Pin('X4', Pin.IN)
+    elif platform == 'rp2':
+        pin = Pin(15, Pin.IN)
+    else:
+        pin = None  # CARRIER raises OSError
+    c = CARRIER(pin)
+    print('Waiting for IR carrier...')
+    res = c.measure()
+    c.close()
+    if res is None:
+        print('No carrier found')
+    else:
+        d = 'not measured' if c.duty is None else '{:4.1f}%'.format(c.duty)
+        print('Frequency {:5.0f}Hz duty {}'.format(c.freq, d))
+        print('Use freq={} duty={}'.format(*res))
+    return res
@@ -0,0 +1,153 @@
+# group.py Multiple IR receivers sharing a timer and delivering one callback.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# Each pin has a receiver instance with its own array of edge times, but all
+# share one timer. The first edge on any pin starts the block timer; when it
+# times out every receiver which saw edges decodes its burst. A frame seen by
+# several receivers thus yields a single call to the user callback. Where more
+# than one receiver decodes it, the result is taken from the one whose timing
+# deviates least from nominal.
+
+from machine import Timer
+from array import array
+from utime import ticks_diff
+from ir_rx import IR_RX, timers
+
+
+# Worst deviation (μs) of the first n edges of a receiver's burst from the
+# nearest nominal mark or space width.
+def deviation(rx, n):
+    times = rx._times
+    nominal = rx._nominal
+    worst = 0
+    for x in range(min(n, rx._nedges + 1) - 1):
+        w = ticks_diff(times[x + 1], times[x])
+        d = w
+        for v in nominal:
+            e = abs(w - v)
+            if e < d:
+                d = e
+        if d > worst:
+            worst = d
+    return worst
+
+
+# Stands in for the Timer of a receiver in a group.
+class _Proxy:
+    def __init__(self, group, rx):
+        self._group = group
+        self._rx = rx
+
+    def init(self, period, mode, callback):
+        g = self._group
+        if callback is self._rx.cb:  # First edge of a burst
+            if not g._busy:  # Other receivers may already have started it
+                g._busy = True
+                g._tim.init(period=period, mode=Timer.ONE_SHOT, callback=g._cbdec)
+        else:  # Key release timeout
+            g._tim.init(period=period, mode=mode, callback=callback)
+
+    def deinit(self):
+        pass
+
+
+class IR_GROUP:
+    def __init__(self, cls, pins, callback, *args):
+        if not pins:
+            raise ValueError("No pins")
+        self._tim = timers.get(cls.Timer_id)
+        self._busy = False
+        self._cbdec = self._decode  # Bound method: avoid allocation
+        self._cmd = 0  # Result of current burst
+        self._addr = 0
+        self._ext = 0
+        self._thresh = 0
+        self._n = 0  # No. of receivers reporting
+        self._dev = 0  # Deviation of best result
+        self._best = -1  # Receiver providing it
+        self._idx = 0  # Receiver being decoded
+        self._nedges = 0  # and its edge count
+        IR_RX._group = self
+        try:
+            self.receivers = [cls(pin, callback, *args) for pin in pins]
+        finally:
+            IR_RX._group = None
+        # Per-receiver statistics
+        n = len(pins)
+        self._good = array("i", (0 for _ in range(n)))  # Valid decodes
+        self._bad = array("i", (0 for _ in range(n)))  # Errors
+        self._missed = array("i", (0 for _ in range(n)))  # Saw no edges
+        self._chosen = array("i", (0 for _ in range(n)))  # Result used
+        self._devsum = array("i", (0 for _ in range(n)))  # Sum of deviations
+        self._lead = self.receivers[0]  # Holds user callback and key state
+
+    def _proxy(self, rx):
+        return _Proxy(self, rx)
+
+    # Block timer has timed out.
+    def _decode(self, t):
+        self._busy = False
+        self._n = 0
+        self._best = -1
+        rxs = self.receivers
+        for i in range(len(rxs)):  # enumerate() would allocate
+            rx = rxs[i]
+            cap = rx._cap
+            n = rx.edge if cap is None else cap.count()
+            if n:
+                self._idx = i
+                self._nedges = n
+                rx.cb(t)  # Runs ._collect
+            else:
+                self._missed[i] += 1
+        if self._n:
+            if self._best >= 0:
+                self._chosen[self._best] += 1
+            self._lead._deliver(self._cmd, self._addr, self._ext, self._thresh)
+
+    # Called by each receiver's do_callback. Keep the valid result with the
+    # least timing deviation or, if there is none, the first error.
+    def _collect(self, cmd, addr, ext, thresh):
+        i = self._idx
+        valid = cmd >= thresh
+        dev = 0
+        if valid:
+            dev = deviation(self.receivers[i], self._nedges)
+            self._good[i] += 1
+            self._devsum[i] += dev
+        else:
+            self._bad[i] += 1
+        if not self._n or (valid and (self._best < 0 or dev < self._dev)):
+            self._cmd = cmd
+            self._addr = addr
+            self._ext = ext
+            self._thresh = thresh
+            self._dev = dev
+            self._best = i if valid else -1
+        self._n += 1
+
+    # Return a tuple per receiver: (valid, errors, missed, chosen, mean
+    # deviation μs).
+    def stats(self):
+        return [
+            (self._good[i], self._bad[i], self._missed[i], self._chosen[i], self._devsum[i] // max(self._good[i], 1))
+            for i in range(len(self.receivers))
+        ]
+
+    def clear_stats(self):
+        for a in (self._good, self._bad, self._missed, self._chosen, self._devsum):
+            for i in range(len(a)):
+                a[i] = 0
+
+    def error_function(self, func):
+        self._lead.error_function(func)
+
+    def key_function(self, func):
+        self._lead.key_function(func)
+
+    def close(self):
+        timers.release(self._tim)
+        for rx in self.receivers:
+            rx.close()
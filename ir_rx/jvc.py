@@ -0,0 +1,47 @@
+# jvc.py Decoder for IR remote control using synchronous code
+# Supports the JVC protocol.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# Frame: 8400μs mark, 4200μs space, 8 bit address, 8 bit data, 526μs stop mark.
+# Bits are LSB first, each a 526μs mark followed by a 526μs (0) or 1574μs (1)
+# space. While a key is held the frame is repeated without the leader.
+
+from utime import ticks_diff
+from ir_rx import IR_RX
+
+class JVC(IR_RX):
+    _trepeat = 55
+    _nominal = (526, 1574, 4200, 8400)  # Mark and space widths (μs)
+    _ctrl_state = True  # ctrl is 0 for a frame with leader, 1 for a repeat
+
+    def __init__(self, pin, callback, *args):
+        # Block lasts <= 47ms and has 36 edges
+        super().__init__(pin, 36, 50, callback, *args)
+
+    def decode(self, _):
+        try:
+            nedges = self.edge
+            if nedges > 36:
+                raise RuntimeError(self.OVERRUN)
+            width = ticks_diff(self._times[1], self._times[0])
+            if 6000 < width < 11000:  # 8400μs leader
+                width = ticks_diff(self._times[2], self._times[1])
+                if not 3000 < width < 5500:  # 4200μs space
+                    raise RuntimeError(self.BADSTART)
+                x = 3  # Edge at start of 1st space
+                ctrl = 0
+            elif 300 < width < 800:  # Repeat: 1st data bit mark
+                x = 1
+                ctrl = 1
+            else:
+                raise RuntimeError(self.BADSTART)
+            if nedges != x + 33:
+                raise RuntimeError(self.BADBLOCK)
+            v = self._pulses(x, 16, 1050)
+            addr = v & 0xff
+            cmd = v >> 8
+        except RuntimeError as e:
+            cmd, addr, ctrl = e.args[0], 0, 0
+        self.do_callback(cmd, addr, ctrl)
@@ -0,0 +1,49 @@
+# kaseikyo.py Decoder for IR remote control using synchronous code
+# Supports the Kaseikyo (Japanese AEHA) 48 bit protocol used by Panasonic,
+# Denon, JVC, Mitsubishi and Sharp among others.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# Frame: 3456μs mark, 1728μs space, 48 bits LSB first, 432μs stop mark. Each bit
+# is a 432μs mark followed by a 432μs (0) or 1296μs (1) space. Bits comprise
+# 16 bit vendor ID, 4 bit vendor parity, 12 bit address, 8 bit data and 8 bit
+# parity (XOR of the three preceding bytes).
+
+from utime import ticks_diff
+from ir_rx import IR_RX
+
+class KASEIKYO(IR_RX):
+    _trepeat = 130
+    _nominal = (432, 1296, 1728, 3456)  # Mark and space widths (μs)
+
+    def __init__(self, pin, callback, *args):
+        # Block lasts <= 89ms and has 100 edges
+        super().__init__(pin, 100, 95, callback, *args)
+
+    def decode(self, _):
+        try:
+            nedges = self.edge
+            if nedges > 100:
+                raise RuntimeError(self.OVERRUN)
+            width = ticks_diff(self._times[1], self._times[0])
+            if not 2800 < width < 4100:  # 3456μs leading mark
+                raise RuntimeError(self.BADSTART)
+            width = ticks_diff(self._times[2], self._times[1])
+            if not 1300 < width < 2200:  # 1728μs space
+                raise RuntimeError(self.BADSTART)
+            if nedges < 100:
+                raise RuntimeError(self.BADBLOCK)
+            # Spaces carry the data
+            vendor = self._pulses(3, 16, 864)
+            w = self._pulses(35, 16, 864)  # Vendor parity, address
+            v = self._pulses(67, 16, 864)  # Data, parity
+            if (vendor ^ vendor >> 4 ^ vendor >> 8 ^ vendor >> 12) & 0xf != w & 0xf:
+                raise RuntimeError(self.BADADDR)
+            cmd = v & 0xff
+            if (w & 0xff) ^ (w >> 8) ^ cmd != v >> 8:
+                raise RuntimeError(self.BADDATA)
+            addr = w >> 4
+        except RuntimeError as e:
+            cmd, addr, vendor = e.args[0], 0, 0
+        self.do_callback(cmd, addr, vendor)
@@ -0,0 +1,168 @@
+# learn.py A store of learned codes, looked up by the frame received.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# Each code is identified by a 32 bit fingerprint. For a decoded frame this is
+# a hash of the protocol name, address and command. For a raw capture (e.g.
+# from ir_rx.acquire) it is a hash of the times of its first frame, each
+# replaced by its class: marks and spaces are each grouped into classes of
+# similar duration. This tolerates the usual errors in received times.
+# The store is a file holding an open addressing hash table of fixed size. A
+# slot holds a fingerprint and the position of its name, which is appended to
+# the end of the file. The table is not read into RAM: a lookup reads one slot
+# and usually no more, then the name. So thousands of codes may be held on
+# boards with little RAM.
+
+import struct
+
+_MAGIC = b"IRD1"
+_HDR = 10  # Magic, no. of slots, no. of codes, no. of slots used
+_SLOT = 8  # Fingerprint, name offset << 8 | name length
+_GAP = 10000  # μs: a longer space ends a frame (as in ir_rx.acquire)
+
+
+def _fnv(h, b):  # FNV-1a hash, one byte
+    return ((h ^ b) * 0x01000193) & 0xFFFFFFFF
+
+
+def _hash(h, v, nbytes):  # Hash nbytes of an int, LSB first
+    for _ in range(nbytes):
+        h = _fnv(h, v & 0xFF)
+        v >>= 8
+    return h
+
+
+# Fingerprint of a decoded frame. proto is a receiver instance or class name
+# e.g. "NEC_16". The ctrl value of the callback is not used as it may hold a
+# toggle bit which changes on each press.
+def fingerprint(proto, addr, cmd):
+    name = proto if isinstance(proto, str) else type(proto).__name__
+    h = _fnv(0x811C9DC5, 0)  # Decoded
+    for c in name.encode():
+        h = _fnv(h, c)
+    return _hash(_hash(h, addr, 4), cmd, 4) or 1
+
+
+# Return the shortest time of each class of mark (first == 0) or space (1) in
+# times[:n]. Times are sorted: a class ends where a time exceeds 1.4 times the
+# shortest in the class plus 60μs.
+def _classes(times, n, first):
+    mins = []
+    for t in sorted(times[x] for x in range(first, n, 2)):
+        if not mins or 5 * t > 7 * mins[-1] + 300:
+            mins.append(t)
+    return mins
+
+
+# Fingerprint of a list of mark and space times. Only the first frame is used.
+def raw_fingerprint(times):
+    n = len(times)
+    for x in range(1, n):
+        if times[x] > _GAP:
+            n = x
+            break
+    if n < 3:
+        raise ValueError("Too few times")
+    cls = (_classes(times, n, 0), _classes(times, n, 1))
+    h = _hash(_fnv(0x811C9DC5, 1), n, 2)  # Raw
+    for x in range(n):
+        t = times[x]
+        mins = cls[x & 1]
+        q = 0  # Class of this time
+        while q + 1 < len(mins) and t >= mins[q + 1]:
+            q += 1
+        h = _fnv(h, q)
+    return h or 1
+
+
+class CODES:
+    # Open the store in file fn, creating it with nslots slots if it does not
+    # exist. nslots must be a power of 2: up to 3/4 of the slots may be used.
+    def __init__(self, fn, nslots=2048):
+        self._buf = bytearray(_SLOT)
+        try:
+            f = open(fn, "r+b")
+        except OSError:
+            if nslots & (nslots - 1) or not 0 < nslots <= 32768:
+                raise ValueError("nslots must be a power of 2 <= 32768")
+            f = open(fn, "w+b")
+            f.write(struct.pack("<4sHHH", _MAGIC, nslots, 0, 0))
+            z = bytes(256)
+            for _ in range(nslots * _SLOT // 256):
+                f.write(z)
+            f.write(bytes(nslots * _SLOT % 256))
+            f.flush()
+        f.seek(0)
+        magic, self._nslots, self.count, self._used = struct.unpack("<4sHHH", f.read(_HDR))
+        if magic != _MAGIC:
+            f.close()
+            raise ValueError("Not a code store")
+        self._f = f
+        self._base = _HDR + self._nslots * _SLOT  # Start of names
+
+    # Return (file position, value) of the slot holding key or, if absent, of
+    # the empty slot ending its probe sequence (value None). The value of a
+    # removed code is 0.
+    def _probe(self, key):
+        f = self._f
+        buf = self._buf
+        mask = self._nslots - 1
+        n = key & mask
+        while True:
+            pos = _HDR + n * _SLOT
+            f.seek(pos)
+            f.readinto(buf)
+            k, v = struct.unpack("<II", buf)
+            if k == key or not k:
+                return pos, (v if k else None)
+            n = (n + 1) & mask
+
+    def _put(self, pos, key, v, dcount, dused=0):
+        f = self._f
+        f.seek(pos)
+        f.write(struct.pack("<II", key, v))
+        self.count += dcount
+        self._used += dused
+        f.seek(6)
+        f.write(struct.pack("<HH", self.count, self._used))
+        f.flush()
+
+    # Public interface.
+    # Store a name for a fingerprint, replacing any existing name. The space
+    # used by a replaced name is not reclaimed.
+    def add(self, key, name):
+        name = name.encode()
+        if not 0 < len(name) < 256:
+            raise ValueError("Name must be 1 to 255 bytes")
+        pos, v = self._probe(key)
+        if v is None and self._used >= self._nslots * 3 // 4:
+            raise ValueError("Store is full")
+        f = self._f
+        f.seek(0, 2)  # Append name
+        off = f.tell() - self._base
+        f.write(name)
+        self._put(pos, key, off << 8 | len(name), 0 if v else 1, 1 if v is None else 0)
+
+    # Return the name stored for a fingerprint, or None.
+    def find(self, key):
+        _, v = self._probe(key)
+        if not v:
+            return None
+        self._f.seek(self._base + (v >> 8))
+        return self._f.read(v & 0xFF).decode()
+
+    def match(self, times):  # Name for a raw capture, or None
+        return self.find(raw_fingerprint(times))
+
+    # Forget a fingerprint. Its slot keeps the key so that probe sequences
+    # passing through it are unaffected. Return False if it was not stored.
+    def remove(self, key):
+        pos, v = self._probe(key)
+        if not v:
+            return False
+        self._put(pos, key, 0, -1)
+        return True
+
+    def close(self):
+        self._f.close()
@@ -0,0 +1,92 @@
+# lowpower.py Low power reception: sleep until IR arrives, then decode.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# The application calls .sleep() in its main loop. This puts the MCU in light
+# sleep with the receiver pin as a wake source. The edges of the burst are
+# timed by the receiver's pin interrupt as usual, but the block timer is not
+# used: decoding is done by .sleep() once the block time has elapsed, after
+# which the application may sleep again.
+# The edge which wakes the MCU may not be timed: on ESP32 the pin is in wake
+# mode, elsewhere the clocks are restarting. If the pin is active on waking and
+# no edge was recorded before then, the time of waking is inserted as the first
+# edge, ahead of any edges timed since. The first mark is therefore shortened by
+# the wake latency. Assumes that the receiver chip idles high.
+
+import machine
+from machine import Pin, lightsleep, disable_irq, enable_irq
+from sys import platform
+from utime import ticks_us, ticks_ms, ticks_diff, sleep_ms
+import gc
+from ir_rx import timers
+
+ESP32 = platform == "esp32"
+
+
+class LOWPOWER:
+    def __init__(self, rx):
+        if rx._cap is not None or rx._group is not None:
+            raise ValueError("Not supported with rp2_dma or IR_GROUP")
+        if platform == "esp8266":
+            raise OSError("ESP8266 cannot wake on a pin")
+        self._rx = rx
+        self._tim = rx.tim
+        rx.tim = timers.Idle()
+        self.wake_us = 0  # First edge to CPU running (None if not timed)
+        self.latency_us = 0  # First edge to decode (and user callback)
+
+    def _wake(self, on):  # ESP32 needs a level triggered wake source
+        if ESP32:
+            rx = self._rx
+            if on:
+                rx._pin.irq(handler=None, trigger=Pin.WAKE_LOW, wake=machine.SLEEP)
+            else:
+                rx._pin.irq(handler=rx._cb_pin, trigger=(Pin.IRQ_FALLING | Pin.IRQ_RISING))
+
+    # Sleep until a burst arrives or until timeout ms elapse (0: indefinitely).
+    # Return True if a burst was decoded. While a key is held, sleep is limited
+    # to the time until release_ms after its last frame, so that key release is
+    # detected.
+    def sleep(self, timeout=0):
+        rx = self._rx
+        if rx._kdown:
+            t = max(rx.release_ms - ticks_diff(ticks_ms(), rx._klast), 0) + 1
+            timeout = min(timeout, t) if timeout else t
+        self._wake(True)
+        if timeout:
+            lightsleep(timeout)
+        else:
+            lightsleep()
+        tw = ticks_us()
+        active = not rx._pin.value()  # Read before edges can be timed
+        self._wake(False)
+        # Edges may have been timed since waking. Check under disable_irq so
+        # that none is missed.
+        st = disable_irq()
+        times = rx._times
+        n = rx.edge
+        # Waking edge was not timed: any edges recorded followed waking
+        synth = active and n < rx._nedges and (not n or ticks_diff(times[0], tw) > 0)
+        if synth:
+            for x in range(n, 0, -1):
+                times[x] = times[x - 1]
+            times[0] = tw
+            rx.edge = n + 1
+            if not n and rx.hold_gc:
+                gc.disable()
+        enable_irq(st)
+        if not rx.edge:  # Woken by timeout or other source
+            if rx._kdown and ticks_diff(ticks_ms(), rx._klast) > rx.release_ms:
+                rx._release_timeout(None)
+            return False
+        t0 = times[0]
+        while ticks_diff(ticks_us(), t0) < rx._tblock * 1000:  # Wait for end of block
+            sleep_ms(1)
+        self.wake_us = None if synth else ticks_diff(tw, t0)
+        self.latency_us = ticks_diff(ticks_us(), t0)
+        rx.decode(None)  # Runs the user callback
+        return True
+
+    def close(self):  # Restore normal operation
+        self._rx.tim = self._tim
@@ -7,26 +7,21 @@
 # WARNING: This is experimental and subject to change.
 
 from utime import ticks_us, ticks_diff
+from irbits import popcount, field
 from ir_rx import IR_RX
 
 class MCE(IR_RX):
+    _nominal = (500, 1000, 2000)  # Mark and space widths (μs)
+    _ctrl_state = True  # ctrl is 0 on first frame, 1 while held, 2 on release
     init_cs = 4  # http://www.hifi-remote.com/johnsfine/DecodeIR.html#OrtekMCE says 3
     def __init__(self, pin, callback, *args):
         # Block lasts ~19ms and has <= 34 edges
         super().__init__(pin, 34, 25, callback, *args)
 
-    def decode(self, _):
-        def check(v):
-            if self.init_cs == -1:
-                return True
-            csum = v >> 12
-            cs = self.init_cs
-            for _ in range(12):
-                if v & 1:
-                    cs += 1
-                v >>= 1
-            return cs == csum
+    def _check(self, v):  # Checksum is init_cs + no. of 1 bits in bits 0-11, mod 16
+        return self.init_cs == -1 or (self.init_cs + popcount(v & 0xfff)) & 0xf == v >> 12
 
+    def decode(self, _):
         try:
             t0 = ticks_diff(self._times[1], self._times[0])  # 2000μs mark
             t1 = ticks_diff(self._times[2], self._times[1])  # 1000μs space
@@ -35,32 +30,17 @@ class MCE(IR_RX):
             nedges = self.edge  # No. of edges detected
             if not 14 <= nedges <= 34:
                 raise RuntimeError(self.OVERRUN if nedges > 28 else self.BADSTART)
-            # Manchester decode
-            mask = 1
-            bit = 1
-            v = 0
-            x = 2
-            for _ in range(16):
-                # -1 convert count to index, -1 because we look ahead
-                if x > nedges - 2:
-                    raise RuntimeError(self.BADBLOCK)
-                # width is 500/1000 nominal
-                width = ticks_diff(self._times[x + 1], self._times[x])
-                if not 250 < width < 1350:
-                    self.verbose and print('Bad block 3 Width', width, 'x', x)
-                    raise RuntimeError(self.BADBLOCK)
-                short = int(width < 750)
-                bit ^= short ^ 1
-                v |= mask if bit else 0
-                mask <<= 1
-                x += 1 + short
+            # Manchester decode, LSB first: width is 500/1000 nominal
+            self._x = 2
+            self._bit = 1
+            v = self._biphase(16, 250, 750, 1350, False)
 
             self.verbose and print(bin(v))
-            if not check(v):
+            if not self._check(v):
                 raise RuntimeError(self.BADDATA)
-            val = (v >> 6) & 0x3f
-            addr = v & 0xf  # Constant for all buttons on my remote
-            ctrl = (v >> 4) & 3
+            val = field(v, 6, 6)
+            addr = field(v, 0, 4)  # Constant for all buttons on my remote
+            ctrl = field(v, 4, 2)
 
         except RuntimeError as e:
             val, addr, ctrl = e.args[0], 0, 0
@@ -11,6 +11,8 @@ from utime import ticks_us, ticks_diff
 from ir_rx import IR_RX
 
 class NEC_ABC(IR_RX):
+    _trepeat = 108
+    _nominal = (563, 1687, 2250, 4500, 9000)  # Mark and space widths (μs)
     def __init__(self, pin, extended, samsung, callback, *args):
         # Block lasts <= 80ms (extended mode) and has 68 edges
         super().__init__(pin, 68, 80, callback, *args)
@@ -32,27 +34,34 @@ class NEC_ABC(IR_RX):
                 # Time spaces only (marks are always 562.5µs)
                 # Space is 1.6875ms (1) or 562.5µs (0)
                 # Skip last bit which is always 1
-                val = 0
-                for edge in range(3, 68 - 2, 2):
-                    val >>= 1
-                    if ticks_diff(self._times[edge + 1], self._times[edge]) > 1120:
-                        val |= 0x80000000
+                # Address and data are assembled separately: a 32 bit value
+                # would be a long int, allocating on every bit.
+                aval = self._pulses(3, 16, 1120)
+                val = self._pulses(35, 16, 1120)
             elif width > 1700: # 2.5ms space for a repeat code. Should have exactly 4 edges.
-                raise RuntimeError(self.REPEAT if self.edge == 4 else self.BADREP)  # Treat REPEAT as error.
+                if self.edge != 4:
+                    raise RuntimeError(self.BADREP)
+                # Sent continuously while a key is held: return without the
+                # allocation of raising an exception. REPEAT uses last address.
+                self.do_callback(self.REPEAT, self._addr, 0, self.REPEAT)
+                return
             else:
                 raise RuntimeError(self.BADSTART)
-            addr = val & 0xff  # 8 bit addr
-            cmd = (val >> 16) & 0xff
-            if cmd != (val >> 24) ^ 0xff:
+            # Each low byte must be the complement of the high byte: XOR of
+            # the two is then 0xff.
+            if (val ^ (val >> 8)) & 0xff != 0xff:
                 raise RuntimeError(self.BADDATA)
-            if addr != ((val >> 8) ^ 0xff) & 0xff:  # 8 bit addr doesn't match check
+            cmd = val & 0xff
+            addr = aval
+            if (aval ^ (aval >> 8)) & 0xff != 0xff:  # 8 bit addr doesn't match check
                 if not self._extended:
                     raise RuntimeError(self.BADADDR)
-                addr |= val & 0xff00  # pass assumed 16 bit address to callback
+            else:
+                addr &= 0xff  # 8 bit addr, else pass assumed 16 bit address
             self._addr = addr
         except RuntimeError as e:
             cmd = e.args[0]
-            addr = self._addr if cmd == self.REPEAT else 0  # REPEAT uses last address
+            addr = 0
         # Set up for new data burst and run user callback
         self.do_callback(cmd, addr, 0, self.REPEAT)
 
@@ -5,9 +5,12 @@
 # Copyright Peter Hinch 2020 Released under the MIT license
 
 from utime import ticks_us, ticks_diff
+from irbits import field
 from ir_rx import IR_RX
 
 class RC5_IR(IR_RX):
+    _trepeat = 114
+    _nominal = (889, 1778)  # Mark and space widths (μs)
     def __init__(self, pin, callback, *args):
         # Block lasts <= 30ms and has <= 28 edges
         super().__init__(pin, 28, 30, callback, *args)
@@ -17,33 +20,15 @@ class RC5_IR(IR_RX):
             nedges = self.edge  # No. of edges detected
             if not 14 <= nedges <= 28:
                 raise RuntimeError(self.OVERRUN if nedges > 28 else self.BADSTART)
-            # Regenerate bitstream
-            bits = 1
-            bit = 1
-            v = 1  # 14 bit bitstream, MSB always 1
-            x = 0
-            while bits < 14:
-                # -1 convert count to index, -1 because we look ahead
-                if x > nedges - 2:
-                    print('Bad block 1 edges', nedges, 'x', x)
-                    raise RuntimeError(self.BADBLOCK)
-                # width is 889/1778 nominal
-                width = ticks_diff(self._times[x + 1], self._times[x])
-                if not 500 < width < 2100:
-                    self.verbose and print('Bad block 3 Width', width, 'x', x)
-                    raise RuntimeError(self.BADBLOCK)
-                short = width < 1334
-                if not short:
-                    bit ^= 1
-                v <<= 1
-                v |= bit
-                bits += 1
-                x += 1 + int(short)
+            # Regenerate 14 bit bitstream, MSB always 1
+            self._x = 0
+            self._bit = 1
+            v = 0x2000 | self._biphase(13, 500, 1334, 2100)  # width is 889/1778 nominal
             self.verbose and print(bin(v))
             # Split into fields (val, addr, ctrl)
-            val = (v & 0x3f) | (0 if ((v >> 12) & 1) else 0x40)  # Correct the polarity of S2
-            addr = (v >> 6) & 0x1f
-            ctrl = (v >> 11) & 1
+            val = field(v, 0, 6) | (0 if field(v, 12, 1) else 0x40)  # Correct the polarity of S2
+            addr = field(v, 6, 5)
+            ctrl = field(v, 11, 1)
 
         except RuntimeError as e:
             val, addr, ctrl = e.args[0], 0, 0
@@ -52,6 +37,8 @@ class RC5_IR(IR_RX):
 
 
 class RC6_M0(IR_RX):
+    _trepeat = 107
+    _nominal = (444, 889, 1333, 2666)  # Mark and space widths (μs)
     # Even on Pyboard D the 444μs nominal pulses can be recorded as up to 705μs
     # Scope shows 360-520 μs (-84μs +76μs relative to nominal)
     # Header nominal 2666, 889, 444, 889, 444, 444, 444, 444 carrier ON at end
@@ -65,7 +52,8 @@ class RC6_M0(IR_RX):
             nedges = self.edge  # No. of edges detected
             if not 22 <= nedges <= 44:
                 raise RuntimeError(self.OVERRUN if nedges > 28 else self.BADSTART)
-            for x, lims in enumerate(self.hdr):
+            for x in range(8):  # enumerate() would allocate
+                lims = self.hdr[x]
                 width = ticks_diff(self._times[x + 1], self._times[x])
                 if not (lims[0] < width < lims[1]):
                     self.verbose and print('Bad start', x, width, lims)
@@ -79,7 +67,6 @@ class RC6_M0(IR_RX):
             short = width < 889
             v = int(not short)
             bit = v
-            bits = 1  # Bits decoded
             x += 1 + int(short)
             width = ticks_diff(self._times[x + 1], self._times[x])
             if not 222 < width < 1555:
@@ -91,33 +78,61 @@ class RC6_M0(IR_RX):
             x += 1 + int(short)  # If it's short, we know width of next
             v <<= 1
             v |= bit  # MSB of result
-            bits += 1
-            # Decode bitstream
-            while bits < 17:
-                # -1 convert count to index, -1 because we look ahead
-                if x > nedges - 2:
-                    raise RuntimeError(self.BADBLOCK)
-                # width is 444/889 nominal
-                width = ticks_diff(self._times[x + 1], self._times[x])
-                if not 222 < width < 1111:
-                    self.verbose and print('Bad block 3 Width', width, 'x', x)
-                    raise RuntimeError(self.BADBLOCK)
-                short = width < 666
-                if not short:
-                    bit ^= 1
-                v <<= 1
-                v |= bit
-                bits += 1
-                x += 1 + int(short)
+            # Decode bitstream: width is 444/889 nominal
+            self._x = x
+            self._bit = bit
+            v = (v << 15) | self._biphase(15, 222, 666, 1111)
 
             if self.verbose:
-                 ss = '20-bit format {:020b} x={} nedges={} bits={}'
-                 print(ss.format(v, x, nedges, bits))
+                 ss = '20-bit format {:020b} x={} nedges={}'
+                 print(ss.format(v, self._x, nedges))
 
-            val = v & 0xff
-            addr = (v >> 8) & 0xff
-            ctrl = (v >> 16) & 1
+            val = field(v, 0, 8)
+            addr = field(v, 8, 8)
+            ctrl = field(v, 16, 1)
         except RuntimeError as e:
             val, addr, ctrl = e.args[0], 0, 0
         # Set up for new data burst and run user callback
         self.do_callback(val, addr, ctrl)
+
+# RC-6 mode 6A with 32 bit data as used by Microsoft MCE and Xbox remotes. The
+# first 16 bits are the customer code (e.g. 0x800f), the rest are data with a
+# toggle bit in the MSB.
+class RC6_M6A(IR_RX):
+    _trepeat = 107
+    _nominal = (444, 889, 1333, 2666)  # Mark and space widths (μs)
+    # Header nominal 2666, 889, 444, 444, 444, 444, 444, 889, 444, 889
+    # Start bit 1, mode 110, trailer 0: carrier ON at end
+    hdr = ((1800, 4000), (593, 1333), (222, 750), (222, 750), (222, 750), (222, 750), (222, 750), (593, 1333),
+           (222, 750), (593, 1333))
+    def __init__(self, pin, callback, *args):
+        # Block lasts 37ms nominal and has <= 78 edges
+        super().__init__(pin, 78, 45, callback, *args)
+
+    def decode(self, _):
+        try:
+            nedges = self.edge  # No. of edges detected
+            if not 40 <= nedges <= 78:
+                raise RuntimeError(self.OVERRUN if nedges > 78 else self.BADSTART)
+            for x in range(10):
+                lims = self.hdr[x]
+                width = ticks_diff(self._times[x + 1], self._times[x])
+                if not (lims[0] < width < lims[1]):
+                    self.verbose and print('Bad start', x, width, lims)
+                    raise RuntimeError(self.BADSTART)
+            # Trailer mark is 889μs. If the first bit is 1 its mark extends it
+            # and edge 11 is the centre of the bit, otherwise edge 12 is.
+            width = ticks_diff(self._times[11], self._times[10])
+            if not 593 < width < 1555:
+                raise RuntimeError(self.BADBLOCK)
+            bit = int(width >= 1111)
+            self._x = 12 - bit
+            self._bit = bit
+            # Decode bitstream in 16 bit halves: width is 444/889 nominal
+            addr = (self._bit << 15) | self._biphase(15, 222, 666, 1111)
+            v = self._biphase(16, 222, 666, 1111)
+            val = v & 0x7fff
+            ctrl = v >> 15
+        except RuntimeError as e:
+            val, addr, ctrl = e.args[0], 0, 0
+        self.do_callback(val, addr, ctrl)
@@ -0,0 +1,103 @@
+# rp2_dma.py Edge capture for IR receivers on RP2 using PIO and DMA.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# A PIO state machine runs a free running 1MHz counter. On each edge of the
+# pulse train it pushes the count to the RX FIFO, and DMA copies it to the
+# receiver's ._times array. The only interrupt is raised by the PIO on the first
+# edge of a burst: this starts the block timer. Timing is therefore unaffected
+# by interrupt latency and GC. Assumes that the receiver chip idles high.
+# The same mechanism, with the cycletimer program, measures the carrier from a
+# raw (not demodulated) photodiode signal: see acquire.py.
+
+import rp2
+
+_PIO_RXF = (0x50200020, 0x50300020)  # Address of PIO0 and PIO1 RXF0 registers
+_free = [7, 6, 5, 4]  # State machines on PIO1: PIO0 is used by ir_tx
+
+
+# The counter decrements every 3 clocks at 3MHz. The inverted value is pushed
+# so that successive values increase, compatible with ticks_diff.
+@rp2.asm_pio()
+def edgetimer():
+    mov(x, invert(null))  # Start counter at 0xffffffff
+    wait(0, pin, 0)  # Wait for first edge
+    irq(rel(0))  # Start block timer
+    label("fall")
+    mov(isr, invert(x))
+    push(noblock)
+    label("low")
+    jmp(x_dec, "l1")
+    label("l1")
+    jmp(pin, "rise")
+    jmp("low")
+    label("rise")
+    mov(isr, invert(x))
+    push(noblock)
+    label("high")
+    jmp(x_dec, "h1")
+    label("h1")
+    jmp(pin, "high")[1]
+    jmp("fall")
+
+
+# Time each carrier cycle of a raw photodiode signal. For each cycle the number
+# of 2-clock loops while the pin is high, then while it is low, is pushed. The
+# push blocks so no cycle is lost while DMA keeps up. Inverted as above.
+@rp2.asm_pio()
+def cycletimer():
+    wait(0, pin, 0)
+    wait(1, pin, 0)  # Start on a rising edge
+    wrap_target()
+    mov(x, invert(null))
+    label("high")
+    jmp(x_dec, "h1")
+    label("h1")
+    jmp(pin, "high")
+    mov(isr, invert(x))
+    push(block)
+    mov(x, invert(null))
+    label("low")
+    jmp(pin, "rise")
+    jmp(x_dec, "low")
+    label("rise")
+    mov(isr, invert(x))
+    push(block)
+    wrap()
+
+
+class RP2_CAPTURE:
+    def __init__(self, pin, buf, callback, prog=edgetimer, freq=3_000_000):
+        if not _free:
+            raise OSError("No free state machine")
+        self.sm_no = _free.pop()
+        self.sm = rp2.StateMachine(self.sm_no, prog, freq=freq, in_base=pin, jmp_pin=pin)
+        if callback is not None:
+            self.sm.irq(callback, hard=True)
+        self.buf = buf
+        self.n = len(buf)
+        self.dma = rp2.DMA()
+        pio, idx = self.sm_no >> 2, self.sm_no & 3
+        self.rxf = _PIO_RXF[pio] + 4 * idx
+        self.ctrl = self.dma.pack_ctrl(size=2, inc_read=False, treq_sel=pio * 8 + 4 + idx)
+
+    # Prepare for a new burst
+    def arm(self):
+        sm = self.sm
+        sm.active(0)
+        self.dma.active(0)
+        while sm.rx_fifo():
+            sm.get()
+        sm.restart()
+        self.dma.config(read=self.rxf, write=self.buf, count=self.n, ctrl=self.ctrl, trigger=True)
+        sm.active(1)
+
+    def count(self):  # No. of edges captured
+        return self.n - self.dma.count
+
+    def close(self):
+        self.sm.active(0)
+        self.sm.irq(None)
+        self.dma.close()
+        _free.append(self.sm_no)
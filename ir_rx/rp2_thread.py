@@ -0,0 +1,204 @@
+# rp2_thread.py Run IR reception and transmission on the second core of an RP2.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# A thread started with _thread runs on core 1. It instantiates the receiver
+# and transmitter, so their interrupts are enabled on core 1. Soft IRQs are
+# scheduled and only run on core 0, so the thread re-registers the receiver's
+# pin interrupt as a hard IRQ: edges are then timed by core 1. With rp2_dma the
+# PIO and DMA time the edges. The receiver's block timer is replaced by
+# polling: the thread decodes a burst when the block time has elapsed. Results pass to core 0 through a ring, as do
+# transmit commands in the other direction. Each ring has one producer and one
+# consumer: the producer writes a slot then advances the write index, so no
+# lock is needed. Core 0 runs the user callbacks when it calls .poll().
+
+import _thread
+from array import array
+from machine import Pin
+from utime import ticks_us, ticks_ms, ticks_diff, sleep_ms
+from ir_rx import timers
+
+_WIDTH = 6  # ints per ring slot
+_IDX = 0xFFFF  # Range of ring indices
+# Result types
+_DATA = 0
+_ERR = 1
+_KEY = 2
+# Commands
+_TX = 0
+_REPEAT = 1
+
+
+class _Ring:  # Single producer, single consumer. n must be a power of 2.
+    def __init__(self, n):
+        if n <= 0 or n & (n - 1) or n > _IDX:  # Indices are masked with n - 1
+            raise ValueError("Ring size must be a power of 2")
+        self.buf = array("i", (0 for _ in range(n * _WIDTH)))
+        self.n = n
+        self.rd = 0
+        self.wr = 0
+
+    def put(self, k, a=0, b=0, c=0, d=0, e=0):  # Producer. False if full.
+        wr = self.wr
+        if ((wr - self.rd) & _IDX) >= self.n:
+            return False
+        buf = self.buf
+        i = (wr & (self.n - 1)) * _WIDTH
+        buf[i] = k
+        buf[i + 1] = a
+        buf[i + 2] = b
+        buf[i + 3] = c
+        buf[i + 4] = d
+        buf[i + 5] = e
+        self.wr = (wr + 1) & _IDX  # Publish the slot
+        return True
+
+    def slot(self):  # Consumer. Index of oldest slot in .buf or -1 if empty.
+        if self.rd == self.wr:
+            return -1
+        return (self.rd & (self.n - 1)) * _WIDTH
+
+    def done(self):  # Consumer has finished with the slot
+        self.rd = (self.rd + 1) & _IDX
+
+
+class IR_THREAD:
+    # rx: (receiver class, pin) tx: (transmitter class, pin) or (class, pin, freq)
+    def __init__(self, callback, *args, rx=None, tx=None, nres=16, ncmd=8):
+        self.callback = callback
+        self.args = args
+        self._nargs = len(args)
+        self._errf = lambda _: None
+        self._keyf = None
+        self._rxspec = rx
+        self._txspec = tx
+        self._res = _Ring(nres)  # Core 1 -> core 0
+        self._cmd = _Ring(ncmd)  # Core 0 -> core 1
+        self.overruns = 0  # Results lost owing to a full ring
+        self._cbd = self._put_data  # Bound methods: avoid allocation
+        self._cbe = self._put_err
+        self._cbk = self._put_key
+        self._running = True
+        self._state = 0  # Thread starting, 1 running, 2 ended
+        self._exc = None
+        _thread.start_new_thread(self._run, ())
+        while not self._state:
+            sleep_ms(5)
+        if self._exc is not None:  # Instantiation failed
+            raise self._exc
+
+    # Core 1 callbacks from the receiver
+    def _put_data(self, cmd, addr, ext):
+        self._res.put(_DATA, cmd, addr, ext) or self._overrun()
+
+    def _put_err(self, err):
+        self._res.put(_ERR, err) or self._overrun()
+
+    def _put_key(self, event, data, addr, count, ms):
+        if self._keyf is not None:
+            self._res.put(_KEY, event, data, addr, count, ms) or self._overrun()
+
+    def _overrun(self):
+        self.overruns += 1
+
+    # Run the user callback. Calling with *args allocates: avoid this in common
+    # cases, as in IR_RX.
+    def _call(self, cmd, addr, ext):
+        a = self.args
+        n = self._nargs
+        if not n:
+            self.callback(cmd, addr, ext)
+        elif n == 1:
+            self.callback(cmd, addr, ext, a[0])
+        elif n == 2:
+            self.callback(cmd, addr, ext, a[0], a[1])
+        else:
+            self.callback(cmd, addr, ext, *a)
+
+    def _run(self):  # Runs on core 1
+        rx = None
+        tx = None
+        try:
+            if self._rxspec is not None:
+                cls, pin = self._rxspec
+                rx = cls(pin, self._cbd)
+                timers.release(rx.tim)
+                rx.tim = timers.Idle()  # Polled below
+                if rx._cap is None:  # Time edges on this core
+                    rx._pin.irq(handler=rx._cb_pin, trigger=(Pin.IRQ_FALLING | Pin.IRQ_RISING), hard=True)
+                rx.error_function(self._cbe)
+                rx.key_function(self._cbk)
+            if self._txspec is not None:
+                tx = self._txspec[0](*self._txspec[1:])
+        except Exception as e:
+            self._exc = e
+            self._running = False
+        self._state = 1
+        cmd = self._cmd
+        buf = cmd.buf
+        t0 = None  # Time (ticks_us) of the first edge of a burst
+        while self._running:
+            if rx is not None:
+                if rx._cap is None:
+                    n = rx.edge
+                    t0 = rx._times[0]
+                else:  # Captures are PIO counts: time from the first edge seen
+                    n = rx._cap.count()
+                    if not n:
+                        t0 = None
+                    elif t0 is None:
+                        t0 = ticks_us()
+                if n and ticks_diff(ticks_us(), t0) >= rx._tblock * 1000:
+                    rx.cb(None)  # Decode
+                elif rx._kdown and not n and ticks_diff(ticks_ms(), rx._klast) > rx.release_ms:
+                    rx._release_timeout(None)
+            if tx is not None and (i := cmd.slot()) >= 0 and not tx.busy():
+                if buf[i] == _TX:
+                    tx.transmit(buf[i + 1], buf[i + 2], buf[i + 3])
+                else:
+                    tx.repeat()
+                cmd.done()
+            sleep_ms(1)
+        if rx is not None:
+            rx.close()
+        if tx is not None:
+            tx.deinit()
+        self._state = 2
+
+    # Public interface: runs on core 0.
+    def error_function(self, func):
+        self._errf = func
+
+    def key_function(self, func):
+        self._keyf = func
+
+    # Queue a transmission. Return False if the command ring is full.
+    def transmit(self, addr, data, toggle=0):
+        return self._cmd.put(_TX, addr, data, toggle)
+
+    def repeat(self):  # NEC and JVC repeat
+        return self._cmd.put(_REPEAT)
+
+    # Run user callbacks for any results from core 1. Return the number run.
+    def poll(self):
+        res = self._res
+        buf = res.buf
+        call = self._call
+        n = 0
+        while (i := res.slot()) >= 0:
+            k = buf[i]
+            if k == _DATA:
+                call(buf[i + 1], buf[i + 2], buf[i + 3])
+            elif k == _ERR:
+                self._errf(buf[i + 1])
+            else:
+                self._keyf(buf[i + 1], buf[i + 2], buf[i + 3], buf[i + 4], buf[i + 5])
+            res.done()
+            n += 1
+        return n
+
+    def close(self):
+        self._running = False
+        while self._state != 2:  # Wait for thread to end
+            sleep_ms(5)
@@ -0,0 +1,52 @@
+# sharp.py Decoder for IR remote control using synchronous code
+# Supports Sharp and Denon protocols.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# A message comprises two 15 bit frames separated by a 40ms space. Bits are LSB
+# first, each a 320μs mark followed by a 680μs (0) or 1680μs (1) space, and each
+# frame ends with a 320μs stop mark. Bits are 5 bit address, 8 bit data, then
+# two bits which are 1, 0 (Sharp) or 0, 0 (Denon). In the second frame all
+# bits other than the address are inverted.
+
+from utime import ticks_diff
+from irbits import field
+from ir_rx import IR_RX
+
+class SHARP(IR_RX):
+    _ext = 1  # Final two bits of first frame
+    _trepeat = 140
+    _nominal = (320, 680, 1680, 40000)  # Mark and space widths (μs)
+
+    def __init__(self, pin, callback, *args):
+        # Block lasts <= 101ms and has 64 edges
+        super().__init__(pin, 64, 105, callback, *args)
+
+    def decode(self, _):
+        try:
+            nedges = self.edge
+            # A held key repeats the message: 65 edges is the start of the next.
+            if nedges > 65:
+                raise RuntimeError(self.OVERRUN)
+            width = ticks_diff(self._times[1], self._times[0])
+            if not 100 < width < 800:  # 320μs mark
+                raise RuntimeError(self.BADSTART)
+            if nedges < 64:
+                raise RuntimeError(self.BADBLOCK)
+            width = ticks_diff(self._times[32], self._times[31])
+            if not 25000 < width < 60000:  # 40ms between frames
+                raise RuntimeError(self.BADBLOCK)
+            v = self._pulses(1, 15, 1180)
+            if v != self._pulses(33, 15, 1180) ^ 0x7fe0:
+                raise RuntimeError(self.BADDATA)
+            if v >> 13 != self._ext:
+                raise RuntimeError(self.BADDATA)
+            addr = field(v, 0, 5)
+            cmd = field(v, 5, 8)
+        except RuntimeError as e:
+            cmd, addr = e.args[0], 0
+        self.do_callback(cmd, addr, 0)
+
+class DENON(SHARP):
+    _ext = 0
@@ -8,6 +8,8 @@ from utime import ticks_us, ticks_diff
 from ir_rx import IR_RX
 
 class SONY_ABC(IR_RX):  # Abstract base class
+    _trepeat = 45
+    _nominal = (600, 1200, 2400)  # Mark and space widths (μs)
     def __init__(self, pin, bits, callback, *args):
         # 20 bit block has 42 edges and lasts <= 39ms nominal. Add 4ms to time
         # for tolerances except in 20 bit case where timing is tight with a
@@ -34,16 +36,9 @@ class SONY_ABC(IR_RX):  # Abstract base class
             if not 350 < width < 1000:  # 600μs space
                 raise RuntimeError(self.BADSTART)
 
-            val = 0  # Data received, LSB 1st
-            x = 2
-            bit = 1
-            while x <= nedges - 2:
-                if ticks_diff(self._times[x + 1], self._times[x]) > 900:
-                    val |= bit
-                bit <<= 1
-                x += 2
-            cmd = val & 0x7f  # 7 bit command
-            val >>= 7
+            # Data received, LSB 1st. Marks are 600μs (0) or 1200μs (1).
+            cmd = self._pulses(2, 7, 900)  # 7 bit command
+            val = self._pulses(16, bits - 7, 900)
             if nedges < 42:
                 addr = val & 0xff  # 5 or 8 bit addr
                 val = 0
@@ -15,8 +15,11 @@ from ir_rx.print_error import print_error  # Optional print of error codes
 # Import all implemented classes
 from ir_rx.nec import NEC_8, NEC_16, SAMSUNG
 from ir_rx.sony import SONY_12, SONY_15, SONY_20
-from ir_rx.philips import RC5_IR, RC6_M0
+from ir_rx.philips import RC5_IR, RC6_M0, RC6_M6A
 from ir_rx.mce import MCE
+from ir_rx.kaseikyo import KASEIKYO
+from ir_rx.jvc import JVC
+from ir_rx.sharp import SHARP, DENON
 
 # Define pin according to platform
 if platform == "pyboard":
@@ -38,7 +41,7 @@ def cb(data, addr, ctrl):
 
 
 def test(proto=0):
-    classes = (NEC_8, NEC_16, SONY_12, SONY_15, SONY_20, RC5_IR, RC6_M0, MCE, SAMSUNG)
+    classes = (NEC_8, NEC_16, SONY_12, SONY_15, SONY_20, RC5_IR, RC6_M0, MCE, SAMSUNG, KASEIKYO, JVC, SHARP, DENON, RC6_M6A)
     ir = classes[proto](p, cb)  # Instantiate receiver
     ir.error_function(print_error)  # Show debug information
     # ir.verbose = True
@@ -64,6 +67,11 @@ test(5) for Philips RC-5 protocol,
 test(6) for RC6 mode 0.
 test(7) for Microsoft Vista MCE.
 test(8) for Samsung.
+test(9) for Kaseikyo (Panasonic).
+test(10) for JVC.
+test(11) for Sharp.
+test(12) for Denon.
+test(13) for RC6 mode 6A.
 
 Hit ctrl-c to stop, then ctrl-d to soft reset."""
 
@@ -0,0 +1,99 @@
+# timers.py Block timers for IR receivers.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# IR_RX.Timer_id selects the timer: -1 is a software timer, n is hardware timer
+# n and None picks a free hardware timer, or a software timer if none is
+# available. Hardware timers picked in this way are returned to a pool by
+# IR_RX.close() and reused by later instances. A hardware timer requested by id
+# is never picked for None, even after it is released.
+# On ESP32 a machine.Timer with a hardware id runs its callback as a soft IRQ.
+# On Pyboard machine.Timer only supports software timers: a pyb.Timer is used,
+# with its hard IRQ scheduling the callback. In either case the callback may
+# allocate, as decoders and user callbacks require.
+
+from sys import platform
+from machine import Timer
+
+if platform == "esp32":
+    HARD = (0, 1, 2, 3)  # ESP32C3 has only 0 and 1
+elif platform == "pyboard":
+    HARD = (6, 7, 12, 13, 14)  # Timers 2 and 5 are used by ir_tx
+else:
+    HARD = ()
+
+_free = []  # Pool of hardware timers released by receivers
+_pooled = []  # Every hardware timer allocated by get(None)
+_pids = []  # Their ids
+_used = set()  # Ids of every hardware timer allocated by get()
+
+
+# A one-shot machine.Timer lookalike using a pyb.Timer at 10KHz.
+class PybTimer:
+    def __init__(self, n):
+        from pyb import Timer as PTimer
+        from micropython import schedule
+
+        self.id = n
+        self._tim = PTimer(n)
+        self._pre = self._tim.source_freq() // 10_000 - 1
+        self._schedule = schedule
+        self._cb = None
+        self._isr = self._hard  # Bound method: avoid allocation
+
+    def init(self, period, mode=Timer.ONE_SHOT, callback=None):  # Only ONE_SHOT
+        self._cb = callback
+        self._tim.init(prescaler=self._pre, period=period * 10 - 1, callback=self._isr)
+
+    def _hard(self, t):
+        t.deinit()
+        self._schedule(self._cb, self)
+
+    def deinit(self):
+        self._tim.deinit()
+
+
+class Idle:  # Stands in for the timer of a receiver whose owner polls it
+    def init(self, period=0, mode=0, callback=None):  # No ** arg: may run in a hard IRQ
+        pass
+
+    def deinit(self):
+        pass
+
+
+def _make(n):
+    return PybTimer(n) if platform == "pyboard" else Timer(n)
+
+
+# Return a timer as specified by tid (see above).
+def get(tid):
+    if tid is None:
+        if _free:
+            return _free.pop()
+        for n in HARD:
+            if n not in _used:
+                try:
+                    t = _make(n)
+                except (ValueError, OSError):  # Not supported on this chip
+                    continue
+                _used.add(n)
+                _pooled.append(t)
+                _pids.append(n)
+                return t
+        tid = -1
+    if tid < 0:
+        return Timer(tid)
+    _used.add(tid)
+    for n, t in zip(_pids, _pooled):  # Withdraw it from the pool
+        if n == tid and t in _free:
+            _free.remove(t)
+    return _make(tid)
+
+
+# Stop a timer. If it came from the pool, return it there.
+def release(t):
+    t.deinit()
+    for p in _pooled:
+        if p is t:
+            _free.append(t)
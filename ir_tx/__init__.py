@@ -18,12 +18,16 @@ else:
 from micropython import const
 from array import array
 from time import ticks_us, ticks_diff, sleep_ms
+from irbits import bitrev
 # import micropython
 # micropython.alloc_emergency_exception_buf(100)
 
 
 # Shared by NEC
 STOP = const(0)  # End of data
+_TMASK = const(0x3FFFFFFF)  # Pyboard compensated mode: T5 counter range
+_THALF = const(0x20000000)
+_RMT_MAX = const(32767)  # ESP32: longest RMT period (μs)
 
 # IR abstract base class. Array holds periods in μs between toggling 36/38KHz
 # carrier on or off. Physical transmission occurs in an ISR context controlled
@@ -32,6 +36,10 @@ class IR:
     _active_high = True  # Hardware turns IRLED on if pin goes high.
     _space = 0  # Duty ratio that causes IRLED to be off
     timeit = False  # Print timing info
+    rp2_dma = False  # RP2: generate carrier in PIO with DMA feed (no per-period IRQ)
+    telemetry = 0  # Pyboard, RP2_RMT: no. of ISR timestamps to record per frame
+    compensate = False  # Pyboard: time periods by output compare on free running T5
+    _atype = 'H'  # Typecode of array of times
 
     @classmethod
     def active_low(cls):
@@ -44,39 +52,129 @@ class IR:
         if ESP32:
             self._rmt = RMT(0, pin=pin, clock_div=80, tx_carrier = (cfreq, duty, 1))
             # 1μs resolution
+            self._pin = pin  # Required to change carrier frequency
+            self._duty = duty
         elif RP2:  # PIO-based RMT-like device
-            self._rmt = RP2_RMT(pin_pulse=None, carrier=(pin, cfreq, duty))  # 1μs resolution
+            if self.rp2_dma:
+                from .rp2_dma import RP2_DMA
+                self._rmt = RP2_DMA(pin, cfreq, duty, asize)  # Resolution 1 carrier cycle
+            else:
+                self._rmt = RP2_RMT(pin_pulse=None, carrier=(pin, cfreq, duty))  # 1μs resolution
             asize += 1  # Allow for possible extra space pulse
         else:  # Pyboard
             if not IR._active_high:
                 duty = 100 - duty
-            tim = Timer(2, freq=cfreq)  # Timer 2/pin produces 36/38/40KHz carrier
-            self._ch = tim.channel(1, Timer.PWM, pin=pin)
+            self._ctim = Timer(2, freq=cfreq)  # Timer 2/pin produces 36/38/40KHz carrier
+            self._ch = self._ctim.channel(1, Timer.PWM, pin=pin)
             self._ch.pulse_width_percent(self._space)  # Turn off IR LED
             # Pyboard: 0 <= pulse_width_percent <= 100
             self._duty = duty
-            self._tim = Timer(5)  # Timer 5 controls carrier on/off times
+            self._oc = None  # T5 output compare channel (compensated mode)
+            if self.compensate:  # T5 runs continuously at 1MHz
+                pre = Timer(5).source_freq() // 1_000_000 - 1
+                self._tim = Timer(5, prescaler=pre, period=_TMASK)
+                self._oc = self._tim.channel(1, Timer.OC_TIMING, compare=0)
+                self._tcmp = 0  # Compare value for current period
+            else:
+                self._tim = Timer(5)  # Timer 5 controls carrier on/off times
+        self._cfreq = cfreq
         self._tcb = self._cb  # Pre-allocate
-        self._arr = array('H', 0 for _ in range(asize))  # on/off times (μs)
+        self._nxt = self._next  # RP2_RMT streaming refill
+        self._tlog = None  # Telemetry
+        self._tidx = 0  # No. of timestamps recorded
+        self._tn = 0  # No. of periods in frame (0 if unknown)
+        self._t0 = None  # Start of encoding
+        self._tenc = 0  # Encode time
+        self._ttrig = 0  # Time of trigger
+        if self.telemetry and not ESP32 and not (RP2 and self.rp2_dma):
+            self._tlog = array('i', (0 for _ in range(self.telemetry)))
+            if RP2:
+                self._rmt.log(self._tlog)
+            else:
+                self._tcb = self._cb_log
+        self._arr = array(self._atype, (0 for _ in range(asize)))  # on/off times (μs)
         self._mva = memoryview(self._arr)
         # Subclass interface
         self.verbose = verbose
         self.carrier = False  # Notional carrier state while encoding biphase
         self.aptr = 0  # Index into array
         self._busy = False
+        self._nv = STOP  # Pyboard: time of the period about to start
+        self._np = 0  # No. of periods started
 
-    def _cb(self, t):  # T5 callback, generate a carrier mark or space
+    # T5 callback, generate a carrier mark or space. The time of the following
+    # period is fetched once the timer has started, to minimise latency.
+    def _cb(self, t):
         self._busy = True
-        t.deinit()
-        p = self.aptr
-        v = self._arr[p]
+        if self._oc is None:
+            t.deinit()
+        v = self._nv
         if v == STOP:
             self._ch.pulse_width_percent(self._space)  # Turn off IR LED.
+            self._oc is None or self._oc.callback(None)
             self._busy = False
             return
-        self._ch.pulse_width_percent(self._space if p & 1 else self._duty)
-        self._tim.init(prescaler=84, period=v, callback=self._tcb)
+        self._ch.pulse_width_percent(self._space if self._np & 1 else self._duty)
+        self._np += 1
+        if self._oc is None:
+            self._tim.init(prescaler=84, period=v, callback=self._tcb)
+        else:
+            self._compare(v)
+        self._nv = self._next()
+
+    # Return the time of the next mark or space, or STOP. Runs in an ISR: must
+    # not allocate. Subclasses which generate times as they are sent (AC,
+    # STREAM) override this and start transmission with ._start().
+    def _next(self):
+        v = self._arr[self.aptr]
         self.aptr += 1
+        return v
+
+    # Compensated mode: the period ends v μs after the end of the last, rather
+    # than v μs after this ISR ran. If that time has passed, end it at once.
+    def _compare(self, v):
+        c = (self._tcmp + v) & _TMASK
+        if (c - self._tim.counter()) & _TMASK > _THALF:
+            c = (self._tim.counter() + 2) & _TMASK
+        self._tcmp = c
+        self._oc.compare(c)
+
+    def _run(self):  # Pyboard: start physical transmission
+        self._np = 0
+        self._nv = self._next()
+        if self._oc is not None:
+            self._tcmp = self._tim.counter()  # First period starts now
+            self._oc.compare((self._tcmp - 1) & _TMASK)  # Prevent immediate match
+            self._oc.callback(self._tcb)
+        self._tcb(self._tim)
+
+    def _cb_log(self, t):  # T5 callback with telemetry: record entry time
+        n = self._tidx
+        if n < len(self._tlog):
+            self._tlog[n] = ticks_us()
+            self._tidx = n + 1
+        self._cb(t)
+
+    # Start a train whose times are supplied by ._next as it is sent. On RP2
+    # (RP2_RMT) ._arr is a ring which the ISR refills from ._next.
+    def _start(self):
+        self._tstart(0)
+        if RP2:
+            arr = self._arr
+            for n in range(len(arr)):
+                arr[n] = self._next()
+            self._rmt.stream(arr, self._nxt)
+        else:
+            self._run()
+
+    # Telemetry: a frame of n periods (0 if not known) is about to start
+    def _tstart(self, n):
+        if self._tlog is not None:
+            self._ttrig = ticks_us()
+            self._tenc = 0 if self._t0 is None else ticks_diff(self._ttrig, self._t0)
+            self._t0 = None
+            self._tn = n
+            self._tidx = 0
 
     def busy(self):
         if ESP32:
@@ -85,6 +183,45 @@ class IR:
             return self._rmt.busy()
         return self._busy
 
+    # Change the carrier frequency (Hz). Waits for any transmission to end.
+    def freq(self, cfreq):
+        if cfreq == self._cfreq:
+            return
+        while self.busy():
+            pass
+        if ESP32:
+            self._rmt.deinit()
+            self._rmt = RMT(0, pin=self._pin, clock_div=80, tx_carrier = (cfreq, self._duty, 1))
+        elif RP2:
+            self._rmt.freq(cfreq)
+        else:
+            self._ctim.freq(cfreq)
+            self._ch.pulse_width_percent(self._space)  # Width is relative to period
+        self._cfreq = cfreq
+
+    # Reacquire hardware shared with other instances, which may have changed the
+    # carrier frequency or taken over the ISR. Call when the hardware is idle.
+    def claim(self):
+        if ESP32:
+            self._rmt.deinit()
+            self._rmt = RMT(0, pin=self._pin, clock_div=80, tx_carrier = (self._cfreq, self._duty, 1))
+        elif RP2:
+            self._rmt.claim(self._cfreq)
+        else:
+            self._ctim.freq(self._cfreq)
+            self._ch.pulse_width_percent(self._space)
+
+    # Release the hardware once any transmission is complete. The instance
+    # cannot be used afterwards.
+    def deinit(self):
+        while self.busy():
+            pass
+        if ESP32 or RP2:
+            self._rmt.deinit()
+        else:
+            self._tim.deinit()
+            self._ctim.deinit()
+
     # Public interface
     # Before populating array, zero pointer, set notional carrier state (off).
     def transmit(self, addr, data, toggle=0, validate=False):  # NEC: toggle is unused
@@ -98,6 +235,7 @@ class IR:
                 raise ValueError('Data out of range', data)
             if toggle > self.valid[2] or toggle < 0:
                 raise ValueError('Toggle out of range', toggle)
+        self._t0 = t
         self.aptr = 0  # Inital conditions for tx: index into array
         self.carrier = False
         self.tx(addr, data, toggle)  # Subclass populates ._arr
@@ -109,6 +247,7 @@ class IR:
 
     # Subclass interface
     def trigger(self):  # Used by NEC to initiate a repeat frame
+        self._tstart(self.aptr)
         if ESP32:
             self._rmt.write_pulses(tuple(self._mva[0 : self.aptr]))
         elif RP2:
@@ -117,7 +256,36 @@ class IR:
         else:
             self.append(STOP)
             self.aptr = 0  # Reset pointer
-            self._cb(self._tim)  # Initiate physical transmission.
+            self._run()  # Initiate physical transmission.
+
+    # Telemetry for the last frame. Returns None if disabled, otherwise a tuple:
+    # encode time, start latency, frame time, no. of periods checked, mean and
+    # worst period error. Times in μs. Errors need the nominal periods: these
+    # are unknown for AC and STREAM whose errors are reported as 0.
+    def stats(self):
+        while self.busy():
+            pass
+        tl = self._tlog
+        if tl is None:
+            return None
+        m = self._rmt.tidx if RP2 else self._tidx
+        if not m:
+            return None
+        arr = self._arr
+        n = self._tn
+        latency = ticks_diff(tl[0], self._ttrig)
+        frame = ticks_diff(tl[m - 1], tl[0])
+        for x in range(m - 1, n):  # RP2 has no IRQ at the end of the last period
+            frame += arr[x]
+        tot = 0
+        worst = 0
+        k = min(m - 1, n)
+        for x in range(k):
+            e = ticks_diff(tl[x + 1], tl[x]) - arr[x]
+            tot += e
+            if abs(e) > abs(worst):
+                worst = e
+        return self._tenc, latency, frame, k, tot / k if k else 0, worst
 
     def append(self, *times):  # Append one or more time peiods to ._arr
         for t in times:
@@ -132,15 +300,71 @@ class IR:
         # .carrier unaffected
         self._arr[self.aptr - 1] += t
 
+    # Bit encoding shared by the protocol classes.
+
+    # Pulse distance or pulse width coding. Append nbits of v, LSB first: a 0
+    # is a mark of m0 and space of s0 μs, a 1 a mark of m1 and space of s1.
+    def _pulses(self, v, nbits, m0, s0, m1, s1):
+        for _ in range(nbits):
+            if v & 1:
+                self.append(m1, s1)
+            else:
+                self.append(m0, s0)
+            v >>= 1
+
+    # Bi-phase (Manchester) coding. Append nbits of v, each comprising two
+    # halves of t μs. If one_mark is True a 1 is a mark followed by a space,
+    # otherwise a space followed by a mark.
+    def _biphase(self, v, nbits, t, one_mark, msb=True):
+        if not msb:
+            v = bitrev(v, nbits)
+        mask = 1 << (nbits - 1)
+        for _ in range(nbits):
+            first = bool(v & mask) == one_mark  # First half is a mark
+            if first == self.carrier:  # Continues the current mark or space
+                self.add(t)
+                self.append(t)
+            else:
+                self.append(t, t)
+            mask >>= 1
+
 
 # Given an iterable (e.g. list or tuple) of times, emit it as an IR stream.
+# This may comprise several frames and the gaps between them, as captured by
+# ir_rx.acquire: the whole sequence is timed by the hardware. Times are 32 bit
+# so that gaps may exceed 65535μs.
 class Player(IR):
+    _atype = 'I'
 
-    def __init__(self, pin, freq=38000, verbose=False, asize=68):  # NEC specifies 38KHz
-        super().__init__(pin, freq, asize, 33, verbose)  # Measured duty ratio 33%
+    def __init__(self, pin, freq=38000, verbose=False, asize=68, duty=33):  # NEC specifies 38KHz
+        super().__init__(pin, freq, asize, duty, verbose)  # Measured duty ratio 33%
+        self._n = asize - 1  # Max no. of times: allow for STOP
 
     def play(self, lst):
+        while self.busy():
+            pass
         for x, t in enumerate(lst):
+            if x >= self._n:
+                raise ValueError('Sequence is longer than asize - 1')
             self._arr[x] = t
         self.aptr = x + 1
-        self.trigger()
+        if ESP32 and max(self._mva[0 : self.aptr]) > _RMT_MAX:
+            self._split()
+        else:
+            self.trigger()
+
+    # ESP32: RMT periods cannot exceed 32767μs. Send longer ones as several
+    # periods of the same level.
+    def _split(self):
+        dur = []
+        lev = []
+        for x in range(self.aptr):
+            t = self._arr[x]
+            v = 1 - (x & 1)  # Marks at even indices
+            while t > _RMT_MAX:
+                dur.append(_RMT_MAX)
+                lev.append(v)
+                t -= _RMT_MAX
+            dur.append(t)
+            lev.append(v)
+        self._rmt.write_pulses(dur, lev)
@@ -0,0 +1,166 @@
+# ac.py Encoders for air conditioner remotes. Frames are long: rather than
+# populating an array with every mark and space, these are generated as
+# transmission proceeds.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# A frame comprises one or more segments, each with an optional header, a run
+# of bits taken from a buffer holding the AC state, and an optional trailer
+# (stop mark and gap). Bits are pulse distance coded, LSB first. ._next returns
+# successive mark and space times. On Pyboard and RP2 (RP2_RMT) the ISR calls
+# it as transmission proceeds (see IR._start), so RAM use does not depend on
+# frame length. On ESP32 the RMT, and on RP2 with rp2_dma, need the entire
+# frame: ._arr is sized to suit and populated before transmission.
+
+from micropython import const
+from ir_tx import IR, STOP, ESP32, RP2
+
+_RING = const(16)  # RP2_RMT: size of ring refilled by the ISR
+
+
+class AC(IR):
+    # Subclass interface
+    # _segs: tuple of segments (header mark, header space, first bit, no. of
+    # bits, gap). A header mark of 0 means no header, a gap of 0 no trailer.
+    # _bit: (bit mark, 0 space, 1 space)
+    # _nbytes: size of buffer. _off: offset of AC state in buffer.
+    _off = 0
+
+    def __init__(self, pin, freq=38000, verbose=False):
+        self._stream = not (ESP32 or (RP2 and self.rp2_dma))
+        n = _RING
+        if not self._stream:  # Array holds whole frame + STOP
+            n = 1
+            for seg in self._segs:
+                n += (2 if seg[0] else 0) + 2 * seg[3] + (2 if seg[4] else 0)
+        super().__init__(pin, freq, n, 33, verbose)
+        self._buf = bytearray(self._nbytes)
+        self._nsegs = len(self._segs)
+        self._sno = self._nsegs  # Segment no.
+        self._ph = 0  # Phase within segment
+        self._nbit = 0  # Bit no. within segment
+
+    # Return the next mark or space time, or STOP at the end of the frame. Runs
+    # in an ISR: must not allocate.
+    def _next(self):
+        while self._sno < self._nsegs:
+            seg = self._segs[self._sno]
+            ph = self._ph
+            self._ph += 1
+            if ph == 0:  # Header mark
+                if seg[0]:
+                    return seg[0]
+                self._ph = 2
+            elif ph == 1:  # Header space
+                return seg[1]
+            elif ph == 2:  # Bit mark
+                if self._nbit < seg[3]:
+                    return self._bit[0]
+                self._ph = 4
+            elif ph == 3:  # Bit space
+                b = seg[2] + self._nbit
+                self._nbit += 1
+                self._ph = 2
+                return self._bit[2] if self._buf[b >> 3] & (1 << (b & 7)) else self._bit[1]
+            elif ph == 4:  # Stop mark
+                if seg[4]:
+                    return self._bit[0]
+                self._sno += 1
+                self._ph = 0
+                self._nbit = 0
+            else:  # Gap
+                self._sno += 1
+                self._ph = 0
+                self._nbit = 0
+                return seg[4]
+        return STOP
+
+    def _checksum(self, buf):  # Subclass calculates checksum(s)
+        pass
+
+    # Public interface. state is a bytes-like object of length .nbytes.
+    def send(self, state):
+        while self.busy():
+            pass
+        buf = self._buf
+        off = self._off
+        for n in range(self.nbytes):
+            buf[off + n] = state[n]
+        self._checksum(buf)
+        self._sno = 0
+        self._ph = 0
+        self._nbit = 0
+        if self._stream:
+            self._start()
+        else:
+            self.aptr = 0
+            while v := self._next():
+                self._arr[self.aptr] = v
+                self.aptr += 1
+            self.trigger()
+
+
+# Sum of bytes start..end - 1 modulo 256
+def _sum(buf, start, end):
+    s = 0
+    for n in range(start, end):
+        s += buf[n]
+    return s & 0xFF
+
+
+# Daikin 280 bit protocol. A 5 bit preamble is followed by sections of 8, 8
+# and 19 bytes, each ending with a checksum byte.
+class DAIKIN(AC):
+    nbytes = 35
+    _nbytes = 36
+    _off = 1  # Buffer byte 0 holds the preamble (all 0)
+    _bit = (428, 428, 1280)
+    _segs = (
+        (0, 0, 0, 5, 29428),
+        (3650, 1623, 8, 64, 29428),
+        (3650, 1623, 72, 64, 29428),
+        (3650, 1623, 136, 152, 29428),
+    )
+
+    def _checksum(self, buf):
+        buf[8] = _sum(buf, 1, 8)
+        buf[16] = _sum(buf, 9, 16)
+        buf[35] = _sum(buf, 17, 35)
+
+
+# Mitsubishi 144 bit protocol. The 18 byte frame is sent twice. Byte 17 is a
+# checksum.
+class MITSUBISHI_AC(AC):
+    nbytes = 18
+    _nbytes = 18
+    _bit = (450, 420, 1300)
+    _segs = (
+        (3400, 1750, 0, 144, 17100),
+        (3400, 1750, 0, 144, 17100),
+    )
+
+    def _checksum(self, buf):
+        buf[17] = _sum(buf, 0, 17)
+
+
+# Gree 64 bit protocol. The frame is sent as two blocks of 4 bytes, the first
+# followed by a 3 bit footer 0b010. The high nibble of byte 7 is a checksum.
+class GREE(AC):
+    nbytes = 8
+    _nbytes = 9
+    _bit = (620, 540, 1600)
+    _segs = (
+        (9000, 4500, 0, 32, 0),
+        (0, 0, 64, 3, 19980),  # Footer in buffer byte 8
+        (0, 0, 32, 32, 19980),
+    )
+
+    def _checksum(self, buf):
+        s = 10
+        for n in range(4):
+            s += buf[n] & 0x0F
+        for n in range(4, 7):
+            s += buf[n] >> 4
+        buf[7] = ((s << 4) & 0xF0) | (buf[7] & 0x0F)
+        buf[8] = 0b010
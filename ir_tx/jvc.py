@@ -0,0 +1,34 @@
+# jvc.py Encoder for IR remote control using synchronous code
+# JVC protocol.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+from micropython import const
+from ir_tx import IR
+
+_TBURST = const(526)
+_T_ONE = const(1574)
+
+class JVC(IR):
+    valid = (0xff, 0xff, 0)  # Max addr, data, toggle
+
+    def __init__(self, pin, freq=38000, verbose=False):
+        super().__init__(pin, freq, 36, 33, verbose)
+        self._v = 0  # Last frame sent
+
+    def _frame(self):
+        self._pulses(self._v, 16, _TBURST, _TBURST, _TBURST, _T_ONE)
+        self.append(_TBURST)
+
+    def tx(self, addr, data, _):  # Ignore toggle
+        self.append(8400, 4200)
+        self._v = (addr & 0xff) | ((data & 0xff) << 8)
+        self._frame()
+
+    # While a key is held the frame is sent without the leader at 50-60ms
+    # intervals.
+    def repeat(self):
+        self.aptr = 0
+        self._frame()
+        self.trigger()
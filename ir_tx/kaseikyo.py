@@ -0,0 +1,29 @@
+# kaseikyo.py Encoder for IR remote control using synchronous code
+# Kaseikyo (Japanese AEHA) 48 bit protocol.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+from micropython import const
+from ir_tx import IR
+
+_T = const(432)
+_T_ONE = const(1296)
+
+class KASEIKYO(IR):
+    valid = (0xfff, 0xff, 0)  # Max addr, data, toggle
+    vendor = 0x2002  # Panasonic. Subclass to change.
+
+    def __init__(self, pin, freq=37000, verbose=False):  # Panasonic specifies 36.7KHz
+        super().__init__(pin, freq, 100, 33, verbose)
+
+    def tx(self, addr, data, _):  # Ignore toggle
+        self.append(3456, 1728)
+        v = self.vendor
+        self._pulses(v, 16, _T, _T, _T, _T_ONE)
+        w = ((v ^ v >> 4 ^ v >> 8 ^ v >> 12) & 0xf) | ((addr & 0xfff) << 4)  # Vendor parity, address
+        self._pulses(w, 16, _T, _T, _T, _T_ONE)
+        data &= 0xff
+        data |= ((w & 0xff) ^ (w >> 8) ^ data) << 8  # Parity
+        self._pulses(data, 16, _T, _T, _T, _T_ONE)
+        self.append(_T)
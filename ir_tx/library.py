@@ -0,0 +1,53 @@
+# library.py Send codes from a compiled library file.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# The file is created by ir_tx.pronto.build or tools/irlib.py. Its index is
+# read once, on instantiation. Sending a code involves a dict lookup and a read
+# of its times straight into ._arr: there is no parsing or allocation. The
+# carrier frequency is changed if it differs from that of the last code sent.
+
+import json
+import struct
+from ir_tx import IR
+
+
+class LIBRARY(IR):
+    def __init__(self, pin, fn, duty=33, verbose=False):
+        f = open(fn, "rb")
+        try:  # The base class needs the longest code: close f on any failure
+            magic, ilen, longest = struct.unpack("<4sIH", f.read(10))
+            if magic != b"IRL1":
+                raise ValueError("Not an IR library")
+            self._index = json.loads(f.read(ilen))
+            self._base = 10 + ilen  # Start of data
+            super().__init__(pin, 38000, longest + 1, duty, verbose)  # +1 for STOP
+        except Exception:
+            f.close()
+            raise
+        self._f = f
+
+    def devices(self):
+        return list(self._index)
+
+    def buttons(self, device):
+        return list(self._index[device])
+
+    # Send the once sequence of a code or, if repeat is True, its repeat
+    # sequence. If the requested sequence is empty the other is sent.
+    def send(self, device, button, repeat=False):
+        freq, off, n, roff, rn = self._index[device][button]
+        if (repeat and rn) or not n:
+            off, n = roff, rn
+        self.freq(freq)  # Waits for any transmission to end
+        while self.busy():
+            pass
+        f = self._f
+        f.seek(self._base + 2 * off)
+        f.readinto(self._mva[0:n])
+        self.aptr = n
+        self.trigger()
+
+    def close(self):
+        self._f.close()
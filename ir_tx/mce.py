@@ -7,6 +7,7 @@
 # WARNING: This is experimental and subject to change.
 
 from micropython import const
+from irbits import popcount
 from ir_tx import IR
 
 _TBIT = const(500)  # Time (μs) for pulse of carrier
@@ -20,25 +21,8 @@ class MCE(IR):
         super().__init__(pin, freq, 34, 30, verbose)
 
     def tx(self, addr, data, toggle):
-        def checksum(v):
-            cs = self.init_cs
-            for _ in range(12):
-                if v & 1:
-                    cs += 1
-                v >>= 1
-            return cs
-
         self.append(2000, 1000, _TBIT)
         d = ((data & 0x3f) << 6) | (addr & 0xf)  | ((toggle & 3) << 4)
-        d |= checksum(d) << 12
+        d |= ((self.init_cs + popcount(d)) & 0xf) << 12  # 4 bit checksum: may wrap
         self.verbose and print(bin(d))
-
-        mask = 1
-        while mask < 0x10000:
-            bit = bool(d & mask)
-            if bit ^ self.carrier:
-                self.add(_TBIT)
-                self.append(_TBIT)
-            else:
-                self.append(_TBIT, _TBIT)
-            mask <<= 1
+        self._biphase(d, 16, _TBIT, False, False)  # LSB first. 1 is space then mark
@@ -18,9 +18,6 @@ class NEC(IR):
     def __init__(self, pin, freq=38000, verbose=False):  # NEC specifies 38KHz also Samsung
         super().__init__(pin, freq, 68, 33, verbose)  # Measured duty ratio 33%
 
-    def _bit(self, b):
-        self.append(_TBURST, _T_ONE if b else _TBURST)
-
     def tx(self, addr, data, _):  # Ignore toggle
         if self.samsung:
             self.append(4500, 4500)
@@ -31,13 +28,9 @@ class NEC(IR):
               addr |= addr << 8
             else:
               addr |= ((addr ^ 0xff) << 8)
-        for _ in range(16):
-            self._bit(addr & 1)
-            addr >>= 1
+        self._pulses(addr, 16, _TBURST, _TBURST, _TBURST, _T_ONE)
         data |= ((data ^ 0xff) << 8)
-        for _ in range(16):
-            self._bit(data & 1)
-            data >>= 1
+        self._pulses(data, 16, _TBURST, _TBURST, _TBURST, _T_ONE)
         self.append(_TBURST)
 
     def repeat(self):
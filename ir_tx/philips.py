@@ -20,18 +20,8 @@ class RC5(IR):
     def tx(self, addr, data, toggle):  # Fix RC5X S2 bit polarity
         d = (data & 0x3f) | ((addr & 0x1f) << 6) | (((data & 0x40) ^ 0x40) << 6) | ((toggle & 1) << 11)
         self.verbose and print(bin(d))
-        mask = 0x2000
-        while mask:
-            if mask == 0x2000:
-                self.append(_T_RC5)
-            else:
-                bit = bool(d & mask)
-                if bit ^ self.carrier:
-                    self.add(_T_RC5)
-                    self.append(_T_RC5)
-                else:
-                    self.append(_T_RC5, _T_RC5)
-            mask >>= 1
+        self.append(_T_RC5)  # 2nd half of start bit
+        self._biphase(d, 13, _T_RC5, False)  # 1 is space then mark
 
 # Philips RC6 mode 0 protocol
 _T_RC6 = const(444)
@@ -53,13 +43,20 @@ class RC6_M0(IR):
         else:
             self.append(_T2_RC6, _T2_RC6)
         d = (data & 0xff) | ((addr & 0xff) << 8)
-        mask = 0x8000
-        self.verbose and print('toggle', toggle, self.carrier, bool(d & mask))
-        while mask:
-            bit = bool(d & mask)
-            if bit ^ self.carrier:
-                self.append(_T_RC6, _T_RC6)
-            else:
-                self.add(_T_RC6)
-                self.append(_T_RC6)
-            mask >>= 1
+        self.verbose and print('toggle', toggle, self.carrier, bool(d & 0x8000))
+        self._biphase(d, 16, _T_RC6, True)  # 1 is mark then space
+
+# Philips RC6 mode 6A 32 bit protocol (Microsoft MCE and Xbox). addr is the 16
+# bit customer code e.g. 0x800f. data is 15 bits, sent after the toggle bit.
+class RC6_M6A(IR):
+    valid = (0xffff, 0x7fff, 1)  # Max addr, data, toggle
+
+    def __init__(self, pin, freq=36000, verbose=False):
+        super().__init__(pin, freq, 76, 30, verbose)
+
+    def tx(self, addr, data, toggle):
+        # leader, 1, 1, 1, 0
+        self.append(2666, _T2_RC6, _T_RC6, _T_RC6, _T_RC6, _T_RC6, _T_RC6, _T2_RC6, _T_RC6)
+        self.append(_T2_RC6, _T2_RC6)  # Trailer bit 0 is of twice duration
+        self._biphase(addr, 16, _T_RC6, True)
+        self._biphase((data & 0x7fff) | ((toggle & 1) << 15), 16, _T_RC6, True)
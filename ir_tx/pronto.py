@@ -0,0 +1,112 @@
+# pronto.py Pronto hex and raw timing formats. Compilation of code libraries.
+# Runs on the target or under CPython (see tools/irlib.py).
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# Times are lists of mark and space durations in μs, starting with a mark. A
+# code comprises a carrier frequency, a sequence sent once and a sequence sent
+# repeatedly while a button is held. Either sequence may be empty.
+# A library file holds compiled codes indexed by device and button name:
+# Header: b"IRL1", index length (u32), longest sequence (u16), little-endian.
+# Index: JSON {device: {button: [freq, offset, length, rpt offset, rpt length]}}
+# Data: times as u16 values. Offsets and lengths are in u16 values.
+
+import json
+import struct
+
+_PRONTO_US = 0.241246  # Pronto frequency unit (μs)
+DEFAULT_FREQ = 38000
+
+
+# Pronto learned (0000) format. Return freq, once, repeat.
+def from_pronto(s):
+    w = [int(x, 16) for x in s.split()]
+    if len(w) < 4 or w[0] != 0:
+        raise ValueError("Unsupported Pronto format")
+    if not w[1] or len(w) != 4 + 2 * (w[2] + w[3]):
+        raise ValueError("Bad Pronto code")
+    period = w[1] * _PRONTO_US  # Carrier period in μs
+    times = [min(max(round(c * period), 1), 0xFFFF) for c in w[4:]]
+    n = 2 * w[2]
+    return round(1_000_000 / period), times[:n], times[n:]
+
+
+# Sequences of odd length (ending with a mark) are given a trailing space of
+# gap μs, as Pronto requires mark/space pairs.
+def to_pronto(freq, once, repeat=(), gap=40000):
+    fw = round(1_000_000 / (freq * _PRONTO_US))
+    period = fw * _PRONTO_US
+    once = list(once) + [gap] * (len(once) & 1)
+    repeat = list(repeat) + [gap] * (len(repeat) & 1)
+    w = [0, fw, len(once) // 2, len(repeat) // 2]
+    w += [max(round(t / period), 1) for t in once + repeat]
+    return " ".join("{:04X}".format(x) for x in w)
+
+
+# Raw timing as a string e.g. "+9000 -4500 +560" or "9000,4500,560". Signs are
+# ignored: marks and spaces alternate.
+def from_raw(s):
+    return [abs(int(x)) for x in s.replace(",", " ").split()]
+
+
+# A code in a library source may be:
+# A Pronto string or a raw string (freq 38KHz).
+# A list of times (freq 38KHz) e.g. as returned by ir_rx.acquire.test().
+# A dict with key "pronto" or keys "raw" (string or list), optionally "repeat"
+# and "freq".
+# Return freq, once, repeat.
+def parse(code):
+    if isinstance(code, dict):
+        if "pronto" in code:
+            return from_pronto(code["pronto"])
+        once, rpt = (code.get(k, ()) for k in ("raw", "repeat"))
+        once, rpt = (from_raw(x) if isinstance(x, str) else list(x) for x in (once, rpt))
+        return code.get("freq", DEFAULT_FREQ), once, rpt
+    if isinstance(code, str):
+        if code.strip().startswith("0000 "):
+            return from_pronto(code)
+        return DEFAULT_FREQ, from_raw(code), []
+    return DEFAULT_FREQ, list(code), []
+
+
+# src: {device: {button: code}}. Write a library file.
+def build(src, fn):
+    index = {}
+    data = []
+    longest = 0
+    for dev, buttons in src.items():
+        d = index.setdefault(dev, {})
+        for btn, code in buttons.items():
+            freq, once, rpt = parse(code)
+            if not once and not rpt:
+                raise ValueError("Empty code", dev, btn)
+            for t in once + rpt:
+                if not 0 < t <= 0xFFFF:
+                    raise ValueError("Time out of range", dev, btn, t)
+            d[btn] = [freq, len(data), len(once), len(data) + len(once), len(rpt)]
+            data += once + rpt
+            longest = max(longest, len(once), len(rpt))
+    idx = json.dumps(index).encode()
+    with open(fn, "wb") as f:
+        f.write(struct.pack("<4sIH", b"IRL1", len(idx), longest))
+        f.write(idx)
+        for t in data:
+            f.write(struct.pack("<H", t))
+
+
+# Read a library file. Return {device: {button: Pronto string}}.
+def export(fn):
+    with open(fn, "rb") as f:
+        magic, ilen, _ = struct.unpack("<4sIH", f.read(10))
+        if magic != b"IRL1":
+            raise ValueError("Not an IR library")
+        index = json.loads(f.read(ilen))
+        data = f.read()
+    get = lambda off, n: [struct.unpack_from("<H", data, 2 * x)[0] for x in range(off, off + n)]
+    res = {}
+    for dev, buttons in index.items():
+        res[dev] = {}
+        for btn, (freq, off, n, roff, rn) in buttons.items():
+            res[dev][btn] = to_pronto(freq, get(off, n), get(roff, rn))
+    return res
@@ -0,0 +1,108 @@
+# rp2_dma.py Carrier generation on RP2 with no per-period interrupts.
+
+# Released under the MIT License (MIT). See LICENSE.
+
+# Copyright (c) 2024 Peter Hinch
+
+# The RP2_RMT class switches a PWM carrier on and off in a hard ISR: one
+# interrupt occurs for every mark and space. Here the PIO generates the carrier
+# itself, toggling the pin by sideset. Each FIFO word holds a mark and the
+# following space, both expressed as a number of carrier cycles. The train is
+# converted to this form before transmission and fed to the FIFO by DMA, so
+# once started a frame needs no Python code. See RP2_RMT.md.
+
+import rp2
+from array import array
+
+_PIO_TXF = (0x50200010, 0x50300010)  # Address of PIO0 and PIO1 TXF0 registers
+_CYCLE = 16  # PIO clocks per carrier cycle
+
+
+# Return a program with a given duty ratio. Each carrier cycle is 16 clocks,
+# hi of which are high. Word format: bits 0-15 mark cycles (0 == end of train),
+# bits 16-31 space cycles - 1. The OSR shifts right so the mark is read first.
+def _program(hi):
+    # The asm_pio decorator replaces module globals: use closure variables.
+    lo = _CYCLE - hi
+    top = _CYCLE - 1
+
+    @rp2.asm_pio(sideset_init=rp2.PIO.OUT_LOW, out_shiftdir=rp2.PIO.SHIFT_RIGHT, autopull=True, pull_thresh=32)
+    def carriertrain():
+        wrap_target()
+        label("next")
+        out(x, 16).side(0)  # No. of carrier cycles. Block if FIFO MT.
+        jmp(not_x, "end").side(0)
+        out(y, 16).side(0)  # No. of space cycles - 1
+        jmp(x_dec, "mark").side(0)  # x >= 1 so this always jumps
+        label("mark")
+        nop().side(1)[hi - 1]
+        jmp(x_dec, "mark").side(0)[lo - 1]
+        label("space")
+        jmp(y_dec, "space").side(0)[top]
+        wrap()
+        label("end")
+        out(null, 16).side(0)  # Discard rest of end word
+        push(noblock).side(0)  # Tell .busy() that the train is complete
+        jmp("next").side(0)
+
+    return carriertrain
+
+
+class RP2_DMA:
+    def __init__(self, pin, freq, duty, asize, sm_no=0):
+        hi = min(max((duty * _CYCLE + 50) // 100, 1), _CYCLE - 1)
+        self.prog = _program(hi)
+        self.pin = pin
+        self.sm = rp2.StateMachine(sm_no, self.prog, freq=freq * _CYCLE, sideset_base=pin)
+        self.sm.active(1)  # Idle, blocking on empty FIFO with carrier off
+        # Scale factor converting μs to carrier cycles: cycles = (t * k) >> 16
+        self.k = (freq * 65536 + 500_000) // 1_000_000
+        self.buf = array("I", (0 for _ in range(asize // 2 + 2)))  # Mark/space pairs + end
+        self.dma = rp2.DMA()
+        pio, idx = sm_no >> 2, sm_no & 3
+        self.txf = _PIO_TXF[pio] + 4 * idx
+        self.ctrl = self.dma.pack_ctrl(size=2, inc_write=False, treq_sel=pio * 8 + idx)
+        self._busy = False
+
+    def _cycles(self, t):  # Convert μs to carrier cycles (1 to 65535)
+        return min(max((t * self.k + 0x8000) >> 16, 1), 0xFFFF)
+
+    # Arg is an array of times in μs terminated by 0.
+    def send(self, ar):
+        while self.busy():
+            pass
+        ar[-1] = 0  # Ensure at least one STOP
+        buf = self.buf
+        n = 0
+        x = 0
+        while d := ar[x]:
+            s = ar[x + 1]  # 0 if train ends in a mark: space is 1 cycle
+            buf[n] = self._cycles(d) | ((self._cycles(s) - 1) << 16)
+            n += 1
+            if not s:
+                break
+            x += 2
+        buf[n] = 0  # End of train
+        self._busy = True
+        self.dma.config(read=buf, write=self.txf, count=n + 1, ctrl=self.ctrl, trigger=True)
+
+    def freq(self, freq):  # Change carrier frequency
+        while self.busy():
+            pass
+        self.sm.active(0)
+        self.sm.init(self.prog, freq=freq * _CYCLE, sideset_base=self.pin)
+        self.sm.active(1)
+        self.k = (freq * 65536 + 500_000) // 1_000_000
+
+    def claim(self, freq):  # Reload program (duty ratio) and frequency after another instance
+        self.freq(freq)
+
+    def busy(self):
+        if self._busy and self.sm.rx_fifo():
+            self.sm.get()
+            self._busy = False
+        return self._busy
+
+    def deinit(self):
+        self.dma.close()
+        self.sm.active(0)
@@ -15,6 +15,7 @@
 # the FIFO. See RP2_RMT.md in the repository root.
 
 from machine import Pin, PWM
+from time import ticks_us
 import rp2
 
 # See above: this function is unused by the IR class.
@@ -48,6 +49,12 @@ class DummyPWM:
     def duty_u16(self, _):
         pass
 
+    def freq(self, _):
+        pass
+
+    def deinit(self):
+        pass
+
 
 class RP2_RMT:
     def __init__(self, pin_pulse=None, carrier=None, sm_no=0, sm_freq=1_000_000):
@@ -69,7 +76,11 @@ class RP2_RMT:
         self.ict = None  # Current IRQ count
         self.icm = 0  # End IRQ count
         self.reps = 0  # 0 == forever n == no. of reps
-        rp2.PIO(0).irq(handler=self._cb, trigger=1 << (sm_no + 8), hard=True)
+        self.refill = None  # Streaming: function returning next time
+        self.tlog = None  # Telemetry
+        self.tidx = 0
+        self._trig = 1 << (sm_no + 8)
+        rp2.PIO(0).irq(handler=self._cb, trigger=self._trig, hard=True)
 
     # IRQ callback. Because of FIFO IRQ's keep arriving after STOP.
     def _cb(self, pio):
@@ -78,7 +89,10 @@ class RP2_RMT:
             self.ict += 1
             if d := self.arr[self.apt]:  # If data available feed FIFO
                 self.sm.put(d)
-                self.apt += 1
+                if self.refill is None:
+                    self.apt += 1
+                else:  # Streaming: refill the entry and wrap round the ring
+                    self._feed()
             else:
                 if r := self.reps != 1:  # All done if reps == 1
                     if r:  # 0 == run forever
@@ -87,9 +101,27 @@ class RP2_RMT:
                     self.apt = 1  # Set pointer and count to state
                     self.ict = 1  # after 1st IRQ
 
+    # Telemetry: record time of each IRQ occurring during a pulse train.
+    def _cb_log(self, pio):
+        n = self.tidx
+        if self.ict is not None and self.ict < self.icm and n < len(self.tlog):
+            self.tlog[n] = ticks_us()
+            self.tidx = n + 1
+        self._cb(pio)
+
+    def log(self, arr):  # Enable telemetry: arr receives IRQ times
+        self.tlog = arr
+        rp2.PIO(0).irq(handler=self._cb_log, trigger=self._trig, hard=True)
+
+    def _feed(self):
+        self.arr[self.apt] = self.refill()
+        self.apt = (self.apt + 1) % len(self.arr)
+        self.icm += 1  # No. of times sent to FIFO
+
     # Arg is an array of times in μs terminated by 0.
     def send(self, ar, reps=1, check=True):
         self.sm.active(0)
+        self.refill = None
         self.reps = reps
         ar[-1] = 0  # Ensure at least one STOP
         for x, d in enumerate(ar):  # Find 1st STOP
@@ -104,6 +136,7 @@ class RP2_RMT:
                 x += 1
                 ar[x] = 0  # STOP
         self.icm = x  # index of 1st STOP
+        self.tidx = 0
         mv = memoryview(ar)
         n = min(x, 4)  # Fill FIFO if there are enough data points.
         self.sm.put(mv[0:n])
@@ -112,6 +145,34 @@ class RP2_RMT:
         self.ict = 0  # IRQ count
         self.sm.active(1)
 
+    # Send a pulse train of any length. ar is a ring initially holding the first
+    # times: refill() returns the next time, 0 at the end. The train must end
+    # with a space.
+    def stream(self, ar, refill):
+        self.sm.active(0)
+        self.reps = 1
+        self.arr = ar
+        self.refill = refill
+        self.apt = 0
+        self.icm = 0
+        self.tidx = 0
+        while self.icm < 4 and (d := ar[self.apt]):  # Fill FIFO
+            self.sm.put(d)
+            self._feed()
+        self.ict = 0
+        self.sm.active(1)
+
+    def freq(self, freq):  # Change carrier frequency
+        self.pwm.freq(freq)
+
+    # Take over the PIO IRQ and the carrier, which another instance using the
+    # same state machine and pin may have reconfigured.
+    def claim(self, freq):
+        self.pwm.freq(freq)
+        self.pwm.duty_u16(0)
+        cb = self._cb if self.tlog is None else self._cb_log
+        rp2.PIO(0).irq(handler=cb, trigger=self._trig, hard=True)
+
     def busy(self):
         if self.ict is None:
             return False  # Just instantiated
@@ -119,3 +180,8 @@ class RP2_RMT:
 
     def cancel(self):
         self.reps = 1
+
+    def deinit(self):
+        self.sm.active(0)
+        rp2.PIO(0).irq(handler=None)
+        self.pwm.deinit()
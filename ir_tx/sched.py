@@ -0,0 +1,152 @@
+# sched.py Interleave frames to several devices by priority and deadline.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# A SCHEDULER owns one or more transmitters (channels), each with a repeat
+# period: the minimum time between the starts of successive frames sent to that
+# device. Requests are held in a fixed pool of slots, so queueing one does not
+# allocate. When no frame is in progress .poll() considers the requests which
+# are due and whose channel period has elapsed. It sends the one of highest
+# priority, then earliest deadline, then earliest due time. A request which
+# cannot start before its deadline is discarded and counted as missed.
+# Frames are sent one at a time because channels normally share hardware (the
+# IR LED, timers, RMT channel or PIO state machine). When the channel changes
+# the new one reclaims the hardware.
+
+from array import array
+from utime import ticks_ms, ticks_diff, ticks_add
+
+_PERIOD = 114  # ms: default repeat period (RC-5, RC-6; NEC is 108)
+# Slot layout
+_WIDTH = 8
+_KIND = 0  # 0 if free
+_CH = 1
+_ADDR = 2
+_DATA = 3
+_TOG = 4
+_PRI = 5
+_AT = 6  # Due time (ticks_ms)
+_DL = 7  # Deadline (ticks_ms)
+# Kinds: bit 2 is set if the request has a deadline
+_TX = 1
+_REPEAT = 2
+_HASDL = 4
+
+
+class SCHEDULER:
+    # Each arg is a transmitter instance or a tuple (instance, period_ms)
+    def __init__(self, *chans, size=16):
+        self._chans = []
+        self._period = array("i", (0 for _ in chans))
+        for n, c in enumerate(chans):
+            if isinstance(c, tuple):
+                c, self._period[n] = c
+            else:
+                self._period[n] = _PERIOD
+            self._chans.append(c)
+        self._last = array("i", (0 for _ in chans))  # Start of last frame
+        self._ready = bytearray(b"\x01" * len(chans))  # Period has elapsed
+        self._buf = array("i", (0 for _ in range(size * _WIDTH)))
+        self._tx = None  # Channel sending the current frame
+        self.sent = 0
+        self.missed = 0  # Requests discarded because their deadline passed
+        self.worst = 0  # Longest delay (ms) from due time to start of a frame
+
+    def _put(self, kind, ch, addr, data, toggle, priority, at, deadline):
+        if not 0 <= ch < len(self._chans):
+            raise ValueError("Invalid channel", ch)
+        buf = self._buf
+        for i in range(0, len(buf), _WIDTH):
+            if not buf[i + _KIND]:
+                at = ticks_ms() if at is None else at
+                if deadline is not None:
+                    kind |= _HASDL
+                    buf[i + _DL] = ticks_add(at, deadline)
+                buf[i + _CH] = ch
+                buf[i + _ADDR] = addr
+                buf[i + _DATA] = data
+                buf[i + _TOG] = toggle
+                buf[i + _PRI] = priority
+                buf[i + _AT] = at
+                buf[i + _KIND] = kind
+                return True
+        return False
+
+    # True if request at index i should be sent before that at j
+    def _before(self, i, j):
+        buf = self._buf
+        if buf[i + _PRI] != buf[j + _PRI]:
+            return buf[i + _PRI] > buf[j + _PRI]
+        di = buf[i + _KIND] & _HASDL
+        dj = buf[j + _KIND] & _HASDL
+        if di != dj:
+            return bool(di)
+        if di and buf[i + _DL] != buf[j + _DL]:
+            return ticks_diff(buf[i + _DL], buf[j + _DL]) < 0
+        return ticks_diff(buf[i + _AT], buf[j + _AT]) < 0
+
+    # Public interface.
+    # Queue a frame for channel ch. at is the time (ticks_ms) at which it is due,
+    # default now. deadline is the time (ms) after that by which it must start,
+    # default no deadline. Larger priority values are sent first. Return False
+    # if the pool is full.
+    def send(self, ch, addr, data, toggle=0, priority=0, at=None, deadline=None):
+        return self._put(_TX, ch, addr, data, toggle, priority, at, deadline)
+
+    def repeat(self, ch, priority=0, at=None, deadline=None):  # NEC and JVC repeat
+        if 0 <= ch < len(self._chans) and not hasattr(self._chans[ch], "repeat"):
+            raise ValueError("Channel has no repeat code", ch)
+        return self._put(_REPEAT, ch, 0, 0, 0, priority, at, deadline)
+
+    def pending(self):
+        buf = self._buf
+        return sum(1 for i in range(0, len(buf), _WIDTH) if buf[i + _KIND])
+
+    # Start the next frame if possible. Return True if one was started.
+    def poll(self):
+        if self._tx is not None and self._tx.busy():
+            return False
+        now = ticks_ms()
+        last = self._last
+        ready = self._ready
+        for ch in range(len(ready)):  # Latch expiry: ticks_diff wraps eventually
+            if not ready[ch] and ticks_diff(now, last[ch]) >= self._period[ch]:
+                ready[ch] = 1
+        buf = self._buf
+        best = -1
+        for i in range(0, len(buf), _WIDTH):
+            kind = buf[i + _KIND]
+            if not kind or ticks_diff(now, buf[i + _AT]) < 0:  # Free or not due
+                continue
+            if kind & _HASDL and ticks_diff(now, buf[i + _DL]) > 0:
+                buf[i + _KIND] = 0
+                self.missed += 1
+                continue
+            if ready[buf[i + _CH]] and (best < 0 or self._before(i, best)):
+                best = i
+        if best < 0:
+            return False
+        ch = buf[best + _CH]
+        tx = self._chans[ch]
+        kind = buf[best + _KIND]
+        buf[best + _KIND] = 0  # Free the slot first: a failed transmit must not repeat
+        last[ch] = now
+        ready[ch] = 0
+        self.worst = max(self.worst, ticks_diff(now, buf[best + _AT]))
+        if tx is not self._tx:  # Channels share hardware
+            tx.claim()
+            self._tx = tx
+        if kind & _TX:
+            tx.transmit(buf[best + _ADDR], buf[best + _DATA], buf[best + _TOG])
+        else:
+            tx.repeat()
+        self.sent += 1
+        return True
+
+    async def run(self):  # Run .poll() as a uasyncio task
+        import uasyncio as asyncio
+
+        while True:
+            self.poll()
+            await asyncio.sleep_ms(1)
@@ -0,0 +1,33 @@
+# sharp.py Encoder for IR remote control using synchronous code
+# Sharp and Denon protocols.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+from micropython import const
+from ir_tx import IR, ESP32
+
+_TBURST = const(320)
+_T_ZERO = const(680)
+_T_ONE = const(1680)
+# Space between frames is 40ms. The ESP32 RMT is limited to 32767μs which is
+# within the tolerance of receivers.
+_GAP = 32767 if ESP32 else 40000
+
+class SHARP(IR):
+    valid = (0x1f, 0xff, 0)  # Max addr, data, toggle
+    _ext = 1  # Final two bits of first frame
+
+    def __init__(self, pin, freq=38000, verbose=False):
+        super().__init__(pin, freq, 64, 33, verbose)
+
+    def tx(self, addr, data, _):  # Ignore toggle
+        v = (addr & 0x1f) | ((data & 0xff) << 5) | (self._ext << 13)
+        self._pulses(v, 15, _TBURST, _T_ZERO, _TBURST, _T_ONE)
+        self.append(_TBURST, _GAP)
+        # Second frame: data and final bits inverted
+        self._pulses(v ^ 0x7fe0, 15, _TBURST, _T_ZERO, _TBURST, _T_ONE)
+        self.append(_TBURST)
+
+class DENON(SHARP):
+    _ext = 0
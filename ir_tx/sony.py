@@ -26,9 +26,7 @@ class SONY_ABC(IR):
         else:
             v |= (addr & 0x1f) << 7
             v |= (ext & 0xff) << 12
-        for _ in range(bits):
-            self.append(1200 if v & 1 else 600, 600)
-            v >>= 1
+        self._pulses(v, bits, 600, 600, 1200, 600)
 
 # Sony specifies 40KHz
 class SONY_12(SONY_ABC):
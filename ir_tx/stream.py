@@ -0,0 +1,88 @@
+# stream.py Transmit pulse trains of any length from a generator or iterable.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# Times are passed from a producer to the ISR via a ring buffer of fixed size.
+# The producer runs as application code (optionally as a uasyncio task) and
+# keeps the ring topped up. The ISR takes times through ._next, as it does for
+# the AC encoders (see IR._start): here ._next removes one from the ring. If it
+# finds the ring empty before the source is exhausted the train is truncated
+# (ending with a space) and the underrun is counted.
+# On ESP32 the RMT requires the entire train: the source is materialised.
+
+from array import array
+from ir_tx import IR, STOP, ESP32, RP2
+
+
+class STREAM(IR):
+    def __init__(self, pin, freq=38000, duty=33, rsize=64, verbose=False):
+        if rsize & (rsize - 1):
+            raise ValueError("rsize must be a power of 2")
+        if RP2 and self.rp2_dma:
+            raise ValueError("Not supported with rp2_dma")
+        # ._arr is only used by RP2_RMT which feeds its FIFO from it
+        super().__init__(pin, freq, 4, duty, verbose)
+        self._ring = array("H", (0 for _ in range(rsize)))
+        self._mask = rsize - 1
+        self._rd = 0  # No. of times removed by ISR
+        self._wr = 0  # No. of times added by producer
+        self._eof = True  # Producer has added last time
+        self.underruns = 0
+
+    # Return the next time from the ring. Runs in an ISR: must not allocate.
+    def _next(self):
+        rd = self._rd
+        if rd >= self._wr:  # Ring is empty (rd may pass wr by a closing space)
+            if not self._eof:  # Producer has fallen behind
+                self.underruns += 1
+                self._eof = True  # Producer will quit
+            if rd & 1:  # Last time was a mark: end with a space
+                self._rd += 1
+                return 1
+            return STOP
+        self._rd += 1
+        return self._ring[rd & self._mask]
+
+    # Generator: add the times from src to the ring, yielding when it is full.
+    def _feed(self, src):
+        while self.busy():
+            yield
+        if ESP32:
+            self._rmt.write_pulses(tuple(src))
+            return
+        ring = self._ring
+        size = len(ring)
+        self._rd = 0
+        self._wr = 0
+        self._eof = False
+        started = False
+        for t in src:
+            while self._wr - self._rd >= size:  # Ring is full
+                if not started:
+                    self._start()
+                    started = True
+                yield
+            if self._eof:  # Underrun: ISR has ended the train
+                return
+            ring[self._wr & self._mask] = t
+            self._wr += 1
+        self._eof = True
+        if not started:
+            self._start()
+
+    # Public interface. src is an iterable (e.g. generator, list or array) of
+    # times in μs: mark, space, mark... Return False on underrun.
+    def send(self, src):
+        n = self.underruns
+        for _ in self._feed(src):
+            pass
+        return n == self.underruns
+
+    async def play(self, src):  # As .send but yields to other tasks
+        import uasyncio as asyncio
+
+        n = self.underruns
+        for _ in self._feed(src):
+            await asyncio.sleep_ms(0)
+        return n == self.underruns
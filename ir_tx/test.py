@@ -19,7 +19,10 @@ from primitives.delay_ms import Delay_ms
 # Import all implemented classes
 from ir_tx.nec import NEC
 from ir_tx.sony import SONY_12, SONY_15, SONY_20
-from ir_tx.philips import RC5, RC6_M0
+from ir_tx.philips import RC5, RC6_M0, RC6_M6A
+from ir_tx.kaseikyo import KASEIKYO
+from ir_tx.jvc import JVC
+from ir_tx.sharp import SHARP, DENON
 
 loop = asyncio.get_event_loop()
 
@@ -39,7 +42,7 @@ class Rbutton:
         self.tim = Delay_ms(self.repeat)
 
     def cfunc(self):  # Button push: send data
-        tog = 0 if self.proto < 3 else Rbutton.toggle  # NEC, sony 12, 15: toggle==0
+        tog = Rbutton.toggle if self.irb.valid[2] else 0  # NEC, sony 12, 15: toggle==0
         self.irb.transmit(self.addr, self.data, tog, True)  # Test validation
         # Auto repeat. The Sony protocol specifies 45ms but this is tight.
         # In 20 bit mode a data burst can be upto 39ms long.
@@ -53,10 +56,10 @@ class Rbutton:
         await asyncio.sleep(0)  # Let timer stop before retriggering
         if not self.sw():  # Button is still pressed: retrigger
             self.tim.trigger(108)
-            if self.proto == 0:
-                self.irb.repeat()  # NEC special case: send REPEAT code
+            if hasattr(self.irb, 'repeat'):
+                self.irb.repeat()  # NEC and JVC special case: send repeat frame
             else:
-                tog = 0 if self.proto < 3 else Rbutton.toggle  # NEC, sony 12, 15: toggle==0
+                tog = Rbutton.toggle if self.irb.valid[2] else 0  # NEC, sony 12, 15: toggle==0
                 self.irb.transmit(self.addr, self.data, tog, True)  # Test validation
 
 async def main(proto):
@@ -67,7 +70,7 @@ async def main(proto):
         pin = Pin(17, Pin.OUT, value = 0)
     else:
         pin = Pin('X1')
-    classes = (NEC, SONY_12, SONY_15, SONY_20, RC5, RC6_M0)
+    classes = (NEC, SONY_12, SONY_15, SONY_20, RC5, RC6_M0, KASEIKYO, JVC, SHARP, DENON, RC6_M6A)
     irb = classes[proto](pin, 38000)  # My decoder chip is 38KHz
     # Uncomment the following to print transmit timing
     # irb.timeit = True
@@ -101,6 +104,11 @@ test(2) for Sony SIRC 15 bit
 test(3) for Sony SIRC 20 bit
 test(4) for Philips RC-5 protocol
 test(5) for Philips RC-6 mode 0.
+test(6) for Kaseikyo (Panasonic)
+test(7) for JVC
+test(8) for Sharp
+test(9) for Denon
+test(10) for Philips RC-6 mode 6A.
 '''
 
 # Pyboard:
@@ -0,0 +1,32 @@
+# irbits.py Bit utilities shared by the ir_rx decoders and ir_tx encoders.
+# Installed with either package.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# Number of 1 bits in each 4 bit value: used by popcount.
+_NBITS = b"\x00\x01\x01\x02\x01\x02\x02\x03\x01\x02\x02\x03\x02\x03\x03\x04"
+
+
+# Return the number of 1 bits in v >= 0. Four bits per iteration.
+def popcount(v):
+    n = 0
+    while v:
+        n += _NBITS[v & 0xF]
+        v >>= 4
+    return n
+
+
+# Return the nbits of v starting at bit start (bit 0 is the LSB).
+def field(v, start, nbits):
+    return (v >> start) & ((1 << nbits) - 1)
+
+
+# Return the low nbits of v in reverse order: converts between MSB first and
+# LSB first bit order.
+def bitrev(v, nbits):
+    r = 0
+    for _ in range(nbits):
+        r = (r << 1) | (v & 1)
+        v >>= 1
+    return r
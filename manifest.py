@@ -0,0 +1,7 @@
+# manifest.py Freeze the IR drivers into firmware.
+# Add the following line to the board's manifest:
+# include("path/to/micropython_ir/manifest.py")
+
+module("irbits.py")
+package("ir_rx")
+package("ir_tx")
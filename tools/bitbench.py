@@ -0,0 +1,69 @@
+# bitbench.py Per-frame cost of the MCE checksum and NEC complement checks.
+# Runs on the target (or under CPython). Install ir_rx then issue
+# $ mpremote run tools/bitbench.py
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# Compares the former implementations (a closure created per frame counting
+# bits in a 12 pass loop; NEC complements checked with separate shifts) with
+# irbits.popcount and the XOR complement check. Results are μs per frame.
+
+try:
+    from utime import ticks_us, ticks_diff
+except ImportError:  # CPython
+    import irsim
+    from irsim import ticks_us, ticks_diff
+from irbits import popcount
+
+N = 1000
+MCE = 0xB3A7  # Valid frame: checksum in bits 12-15
+NEC = (0xE11E, 0xBF40)  # Data and address values
+
+
+def mce_old(v, init_cs=4):
+    def checksum(v):
+        cs = init_cs
+        for _ in range(12):
+            if v & 1:
+                cs += 1
+            v >>= 1
+        return cs
+
+    return checksum(v & 0xFFF) == v >> 12
+
+
+def mce_new(v, init_cs=4):
+    return (init_cs + popcount(v & 0xFFF)) & 0xF == v >> 12
+
+
+def nec_old(val, aval):
+    addr = aval & 0xFF
+    cmd = val & 0xFF
+    return cmd == (val >> 8) ^ 0xFF and addr == ((aval >> 8) ^ 0xFF) & 0xFF
+
+
+def nec_new(val, aval):
+    return (val ^ (val >> 8)) & 0xFF == 0xFF and (aval ^ (aval >> 8)) & 0xFF == 0xFF
+
+
+def timeit(func, *args):
+    t = ticks_us()
+    for _ in range(N):
+        func(*args)
+    return ticks_diff(ticks_us(), t) / N
+
+
+def test():
+    for name, old, new, args in (
+        ("MCE checksum", mce_old, mce_new, (MCE,)),
+        ("NEC complement", nec_old, nec_new, NEC),
+    ):
+        if old(*args) != new(*args):
+            raise AssertionError(name)
+        a = timeit(old, *args)
+        b = timeit(new, *args)
+        print("{:16s} old {:6.1f}μs new {:6.1f}μs saving {:5.1f}μs/frame".format(name, a, b, a - b))
+
+
+test()
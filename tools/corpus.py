@@ -0,0 +1,142 @@
+# corpus.py Golden trace regression test for the ir_rx decoders.
+# Runs under CPython on the PC.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# The corpus in tools/corpus/ holds one JSON file per protocol. Each entry is a
+# burst of edge times (μs relative to t0) with the result expected from the
+# decoder. Usage:
+# $ python3 tools/corpus.py  # Check every trace, exit status 1 on failure
+# $ python3 tools/corpus.py --generate  # Rebuild the synthesised traces
+# Traces captured from real remotes (e.g. with ir_rx.acquire, converting the
+# returned periods to edge times) may be added to the files by hand with
+# "name" starting "rec". --generate preserves these.
+# If NumPy is installed each trace of a protocol supported by ir_offline is also
+# decoded by it: the result must be the same.
+
+import argparse
+import json
+import os
+import random
+import sys
+
+import irsim
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+# Protocols decoded by ir_offline and the name of its decoder
+OFFLINE = {
+    "nec8": "nec8",
+    "nec16": "nec",
+    "samsung": "samsung",
+    "sony12": "sony",
+    "sony15": "sony",
+    "sony20": "sony",
+    "rc5": "rc5",
+    "rc6": "rc6",
+    "mce": "mce",
+}
+T0 = irsim.TICKS_PERIOD - 20_000  # Start bursts near ticks wrap
+
+
+# Synthesised traces. Values are chosen to exercise every bit position.
+def synthesise(proto, rng):
+    maxaddr, maxdata, maxtog = irsim.PROTOCOLS[proto][2]
+    values = [(0, 0, 0), (maxaddr, maxdata, maxtog)]
+    values += [(rng.randint(0, maxaddr), rng.randint(0, maxdata), rng.randint(0, maxtog)) for _ in range(4)]
+    dec = irsim.decoder(proto)
+    for n, (addr, data, tog) in enumerate(values):
+        periods = irsim.encode(proto, addr, data, tog)
+        times = irsim.edges(periods, T0)
+        want = irsim.expected(proto, addr, data, tog)
+        if dec(times) != want:  # Nominal timing must decode
+            raise AssertionError("{} nominal {}: got {} want {}".format(proto, n, dec(times), want))
+        yield "nominal {}".format(n), times
+        for jit in (50, 100, 150):
+            yield "jitter {} {}".format(jit, n), irsim.edges([max(p + rng.randint(-jit, jit), 1) for p in periods], T0)
+        x = rng.randrange(1, len(times) - 1)
+        yield "missing edge {} {}".format(x, n), times[:x] + times[x + 1 :]
+        x = rng.randrange(1, len(times) - 1)
+        t = (times[x] + times[x + 1]) // 2
+        yield "glitch {} {}".format(x, n), times[: x + 1] + [t, t + 100] + times[x + 1 :]
+        yield "truncated {}".format(n), times[: len(times) // 2]
+        extra = [times[-1] + 300 * (i + 1) for i in range(8)]
+        yield "overrun {}".format(n), times + extra
+
+
+def fname(proto):
+    return os.path.join(CORPUS, proto + ".json")
+
+
+def load(proto):
+    try:
+        with open(fname(proto)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def generate():
+    os.makedirs(CORPUS, exist_ok=True)
+    for proto in irsim.PROTOCOLS:
+        rng = random.Random(proto)  # Deterministic per protocol
+        dec = irsim.decoder(proto)
+        entries = [e for e in load(proto) if e["name"].startswith("rec")]
+        for name, times in synthesise(proto, rng):
+            rel = [t - T0 for t in times]
+            entries.append({"name": name, "t0": T0, "times": rel, "expect": list(dec(times))})
+        with open(fname(proto), "w") as f:
+            f.write("[\n")
+            f.write(",\n".join(json.dumps(e, separators=(",", ":")) for e in entries))
+            f.write("\n]\n")
+        print("{:8s} {:3d} traces".format(proto, len(entries)))
+
+
+def _offline():  # Return ir_offline if NumPy is installed, else None
+    try:
+        import ir_offline
+    except ImportError:
+        print("NumPy not installed: ir_offline not checked")
+        return None
+    return ir_offline
+
+
+def check():
+    fail = 0
+    total = 0
+    off = _offline()
+    for proto in irsim.PROTOCOLS:
+        dec = irsim.decoder(proto)
+        odec = off.DECODERS[OFFLINE[proto]] if off is not None and proto in OFFLINE else None
+        entries = load(proto)
+        for e in entries:
+            t0 = e.get("t0", 0)
+            times = [t0 + t for t in e["times"]]
+            got = list(dec(times))
+            if got != e["expect"]:
+                print("FAIL {} {}: got {} expected {}".format(proto, e["name"], got, e["expect"]))
+                fail += 1
+            if odec is not None:
+                res = odec(off.unwrap(times))
+                got = [int(r[0]) for r in res[1:]] if len(res[0]) == 1 else None
+                if got != e["expect"]:
+                    print("FAIL offline {} {}: got {} expected {}".format(proto, e["name"], got, e["expect"]))
+                    fail += 1
+        total += len(entries)
+        print("{:8s} {:3d} traces{}".format(proto, len(entries), " (and offline)" if odec else ""))
+    print("{} traces, {} failures".format(total, fail))
+    return not fail
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Golden trace test for ir_rx decoders")
+    parser.add_argument("--generate", action="store_true", help="Rebuild synthesised traces")
+    args = parser.parse_args()
+    if args.generate:
+        generate()
+    elif not check():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# fuzz.py Randomised test of the ir_rx decoders against the ir_tx encoders.
+# Runs under CPython on the PC.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# Three properties are checked for each protocol:
+# 1. Random values sent with nominal timing decode correctly.
+# 2. Random values with timing jitter up to SAFE[proto] μs decode correctly.
+# 3. Arbitrary damage (dropped, inserted and shifted edges, gross jitter) never
+# causes an exception. The result is the value sent or an error code: a wrong
+# value is an undetected error. These are counted, as some are unavoidable
+# where a protocol has no check bits.
+# Failures of 1 or 2, or an exception, give exit status 1.
+
+# Decode throughput is measured for each protocol. With --record FILE a line
+# per protocol (git revision, protocol, μs per decode) is appended to FILE and
+# compared with the previous entry, so that speed regressions are visible.
+# Usage:
+# $ python3 tools/fuzz.py -n 2000 --seed 1 --record perf.txt
+
+import argparse
+import random
+import subprocess
+import sys
+import time
+import traceback
+
+import irsim
+
+# Timing jitter (μs) each decoder must tolerate.
+SAFE = {
+    "nec8": 200,
+    "nec16": 200,
+    "samsung": 200,
+    "sony12": 200,
+    "sony15": 200,
+    "sony20": 200,
+    "rc5": 150,
+    "rc6": 80,
+    "mce": 100,
+    "rc6a": 80,
+    "kaseikyo": 200,
+    "jvc": 200,
+    "sharp": 150,
+    "denon": 150,
+}
+
+
+def _value(proto, rng):
+    return [rng.randint(0, m) for m in irsim.PROTOCOLS[proto][2]]
+
+
+def _damage(times, rng):
+    times = list(times)
+    for _ in range(rng.randint(1, 3)):
+        op = rng.randrange(5)
+        n = len(times)
+        if op == 0 and n > 2:  # Drop an edge
+            del times[rng.randrange(1, n)]
+        elif op == 1:  # Insert a glitch
+            x = rng.randrange(n)
+            t = times[x] + rng.randint(1, 2000)
+            times[x + 1 : x + 1] = [t, t + rng.randint(1, 300)]
+        elif op == 2:  # Gross jitter
+            times = [t + rng.randint(-400, 400) for t in times]
+        elif op == 3:  # Truncate
+            del times[rng.randint(1, n) :]
+        else:  # Trailing noise
+            times += [times[-1] + rng.randint(100, 3000) * (i + 1) for i in range(rng.randint(1, 20))]
+    # Edges must be in order as they are in a real capture
+    return sorted(times)
+
+
+def fuzz(proto, n, rng):
+    dec = irsim.decoder(proto)
+    fail = undetected = 0
+    for _ in range(n):
+        addr, data, tog = _value(proto, rng)
+        periods = irsim.encode(proto, addr, data, tog)
+        want = irsim.expected(proto, addr, data, tog)
+        t0 = rng.randrange(irsim.TICKS_PERIOD)  # Include wrap-round
+        try:
+            got = dec(irsim.edges(periods, t0))
+            if got != want:
+                print("FAIL {} nominal {}: got {} want {}".format(proto, (addr, data, tog), got, want))
+                fail += 1
+            j = SAFE[proto]
+            jittered = [max(p + rng.randint(-j, j), 1) for p in periods]
+            got = dec(irsim.edges(jittered, t0))
+            if got != want:
+                print("FAIL {} jitter {}: got {} want {} periods {}".format(proto, j, got, want, jittered))
+                fail += 1
+            times = _damage(irsim.edges(periods, t0), rng)
+            got = dec(times)
+            if got is None:
+                print("FAIL {} no callback: times {}".format(proto, times))
+                fail += 1
+            elif got != want and got[0] >= 0:
+                undetected += 1
+        except Exception:
+            traceback.print_exc()
+            print("FAIL {} exception: value {}".format(proto, (addr, data, tog)))
+            fail += 1
+    return fail, undetected
+
+
+def throughput(proto, reps=2000):
+    dec = irsim.decoder(proto)
+    addr, data, tog = _value(proto, random.Random(0))
+    times = irsim.edges(irsim.encode(proto, addr, data, tog))
+    t = time.perf_counter()
+    for _ in range(reps):
+        dec(times)
+    return (time.perf_counter() - t) * 1e6 / reps
+
+
+def _revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=irsim.ROOT, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _previous(fn):
+    last = {}
+    try:
+        with open(fn) as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) == 3:
+                    last[fields[1]] = float(fields[2])
+    except FileNotFoundError:
+        pass
+    return last
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzz test of ir_rx decoders")
+    parser.add_argument("-n", type=int, default=1000, help="Iterations per protocol")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    parser.add_argument("--record", metavar="FILE", help="Append decode times to FILE")
+    parser.add_argument("protocols", nargs="*", default=list(irsim.PROTOCOLS))
+    args = parser.parse_args()
+    seed = random.randrange(1 << 32) if args.seed is None else args.seed
+    print("Seed", seed)
+    prev = _previous(args.record) if args.record else {}
+    rev = _revision()
+    lines = []
+    failed = 0
+    for proto in args.protocols:
+        fail, undetected = fuzz(proto, args.n, random.Random("{}{}".format(seed, proto)))
+        us = throughput(proto)
+        failed += fail
+        s = "{:8s} {:5d} failures {:5d} undetected errors {:7.1f}μs/decode".format(proto, fail, undetected, us)
+        if proto in prev:
+            s += " ({:+.0f}%)".format(100 * (us - prev[proto]) / prev[proto])
+        print(s)
+        lines.append("{} {} {:.1f}\n".format(rev, proto, us))
+    if args.record:
+        with open(args.record, "a") as f:
+            f.writelines(lines)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
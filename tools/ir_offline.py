@@ -0,0 +1,265 @@
+# ir_offline.py Batch decoding of captured IR edge times under CPython.
+# Requires NumPy.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# The decoders in ir_rx process one burst at a time in a timer callback. Here
+# an array of edge times (μs) containing any number of bursts is split into
+# bursts and every burst is decoded at once. The timing rules and error codes
+# are those of the ir_rx classes NEC_ABC, SONY_ABC, RC5_IR, RC6_M0 and MCE:
+# fixed length protocols are decoded with array operations across all bursts
+# and bits; for the bi-phase protocols the per-bit loop of the device code is
+# retained but each iteration operates on every burst at once.
+
+# Each decoder returns a tuple of arrays (t0, data, addr, ctrl), one element per
+# burst. t0 is the time of the first edge. data, addr and ctrl are as passed to
+# the ir_rx user callback. A negative data value is an error code (or the NEC
+# repeat code) as used by IR_RX.
+
+# Command line usage:
+# $ python3 tools/ir_offline.py nec capture.txt
+# The file holds edge times in μs separated by whitespace or commas, or is a
+# .npy file.
+
+import sys
+import time
+import numpy as np
+
+# Result/error codes as in ir_rx.IR_RX
+REPEAT = -1
+BADSTART = -2
+BADBLOCK = -3
+BADREP = -4
+OVERRUN = -5
+BADDATA = -6
+BADADDR = -7
+
+TICKS_PERIOD = 1 << 30  # utime.ticks_us() wraps at this value
+
+
+def unwrap(times, period=TICKS_PERIOD):
+    """Convert ticks_us() values, which may have wrapped, to monotonic times."""
+    t = np.asarray(times, dtype=np.int64)
+    if len(t) < 2:
+        return t
+    d = np.diff(t) % period
+    return np.concatenate(([t[0]], t[0] + np.cumsum(d)))
+
+
+def segment(times, gap):
+    """Split edge times into bursts at intervals exceeding gap μs.
+    Returns (starts, counts): index of first edge and no. of edges per burst."""
+    t = np.asarray(times, dtype=np.int64)
+    if not len(t):
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(t) > gap) + 1))
+    counts = np.diff(np.concatenate((starts, [len(t)])))
+    return starts, counts
+
+
+# Return an (m, n - 1) array of the widths of the first n - 1 intervals of each
+# burst. Intervals beyond the end of a burst are 0.
+def _widths(t, starts, counts, n):
+    col = np.arange(n)
+    valid = col < counts[:, None]
+    idx = np.where(valid, starts[:, None] + col, starts[:, None])
+    w = np.diff(t[idx], axis=1)
+    w[~valid[:, 1:]] = 0
+    return w
+
+
+def _bursts(times, gap):
+    t = np.asarray(times, dtype=np.int64)
+    starts, counts = segment(t, gap)
+    return t, starts, counts
+
+
+# Set the error code of bursts meeting cond which are not already in error.
+# As in the device code, the first error detected takes precedence.
+def _err(err, cond, code):
+    np.copyto(err, code, where=cond & (err == 0), casting="unsafe")
+
+
+def _result(t, starts, err, data, addr, ctrl):
+    ok = err == 0
+    return (t[starts], np.where(ok, data, err), np.where(ok, addr, 0), np.where(ok, ctrl, 0))
+
+
+_W = 1 << np.arange(32, dtype=np.int64)  # Bit weights
+
+
+def nec(times, extended=True, samsung=False, gap=10000):
+    """NEC_ABC rules. extended=False is NEC_8, samsung=True is SAMSUNG."""
+    t, starts, counts = _bursts(times, gap)
+    w = _widths(t, starts, counts, 68)
+    err = np.zeros(len(starts), np.int64)
+    _err(err, counts > 68, OVERRUN)
+    _err(err, w[:, 0] < (2500 if samsung else 4000), BADSTART)
+    data = w[:, 1] > 3000  # 4.5ms space for normal data
+    rep = ~data & (w[:, 1] > 1700)  # 2.5ms space for a repeat code
+    _err(err, data & (counts < 68), BADBLOCK)
+    _err(err, rep, np.where(counts == 4, REPEAT, BADREP))
+    _err(err, ~(data | rep), BADSTART)
+    bits = w[:, 3:66:2] > 1120  # Spaces only: 32 bits LSB first
+    aval = bits[:, :16] @ _W[:16]
+    val = bits[:, 16:] @ _W[:16]
+    addr = aval & 0xFF
+    cmd = val & 0xFF
+    _err(err, cmd != (val >> 8) ^ 0xFF, BADDATA)
+    bad = addr != ((aval >> 8) ^ 0xFF) & 0xFF  # 8 bit addr doesn't match check
+    if extended:
+        addr = np.where(bad, addr | (aval & 0xFF00), addr)
+    else:
+        _err(err, bad, BADADDR)
+    # REPEAT reports the address of the most recent good burst
+    good = err == 0
+    last = np.maximum.accumulate(np.where(good, np.arange(len(err)), -1))
+    repaddr = np.where(last >= 0, addr[np.maximum(last, 0)], 0)
+    t0, data, addr, ctrl = _result(t, starts, err, cmd, addr, 0)
+    return t0, data, np.where(err == REPEAT, repaddr, addr), ctrl
+
+
+def samsung(times, gap=10000):
+    return nec(times, True, True, gap)
+
+
+def sony(times, gap=5000):
+    """SONY_ABC rules. Handles 12, 15 and 20 bit bursts."""
+    t, starts, counts = _bursts(times, gap)
+    w = _widths(t, starts, counts, 42)
+    err = np.zeros(len(starts), np.int64)
+    _err(err, counts > 42, OVERRUN)
+    _err(err, ~np.isin(counts, (26, 32, 42)), BADBLOCK)
+    _err(err, (w[:, 0] <= 1800) | (w[:, 0] >= 3000), BADSTART)  # 2.4ms leading mark
+    _err(err, (w[:, 1] <= 350) | (w[:, 1] >= 1000), BADSTART)  # 600μs space
+    x = np.arange(2, 41, 2)  # Marks carry the data, LSB first
+    bits = (w[:, x] > 900) & (x <= (counts - 2)[:, None])
+    val = bits @ _W[:20]
+    cmd = val & 0x7F  # 7 bit command
+    val >>= 7
+    short = counts < 42
+    addr = np.where(short, val & 0xFF, val & 0x1F)  # 5 or 8 bit addr
+    ext = np.where(short, 0, val >> 5)  # 8 bit extended
+    return _result(t, starts, err, cmd, addr, ext)
+
+
+def rc5(times, gap=5000):
+    """RC5_IR rules."""
+    t, starts, counts = _bursts(times, gap)
+    w = _widths(t, starts, counts, 28)
+    m = len(starts)
+    rows = np.arange(m)
+    err = np.zeros(m, np.int64)
+    _err(err, (counts < 14) | (counts > 28), np.where(counts > 28, OVERRUN, BADSTART))
+    bit = np.ones(m, np.int64)
+    v = np.ones(m, np.int64)  # 14 bit bitstream, MSB always 1
+    x = np.zeros(m, np.int64)
+    for _ in range(13):
+        _err(err, x > counts - 2, BADBLOCK)
+        width = w[rows, np.minimum(x, 26)]  # width is 889/1778 nominal
+        _err(err, (width <= 500) | (width >= 2100), BADBLOCK)
+        short = width < 1334
+        bit ^= ~short
+        v = (v << 1) | bit
+        x += 1 + short
+    val = (v & 0x3F) | np.where((v >> 12) & 1, 0, 0x40)  # Correct the polarity of S2
+    return _result(t, starts, err, val, (v >> 6) & 0x1F, (v >> 11) & 1)
+
+
+# As RC6_M0.hdr
+_RC6_HDR = np.array(((1800, 4000), (593, 1333), (222, 750), (593, 1333), (222, 750), (222, 750), (222, 750), (222, 750)))
+
+
+def rc6(times, gap=5000):
+    """RC6_M0 rules."""
+    t, starts, counts = _bursts(times, gap)
+    w = _widths(t, starts, counts, 44)
+    m = len(starts)
+    rows = np.arange(m)
+    err = np.zeros(m, np.int64)
+    _err(err, (counts < 22) | (counts > 44), np.where(counts > 44, OVERRUN, BADSTART))
+    hdr = w[:, :8]
+    _err(err, ((hdr <= _RC6_HDR[:, 0]) | (hdr >= _RC6_HDR[:, 1])).any(axis=1), BADSTART)
+    width = w[:, 8]  # 2nd bit of last 0 is 444μs (0) or 1333μs (1)
+    _err(err, (width <= 222) | (width >= 1555), BADBLOCK)
+    short = width < 889
+    v = (~short).astype(np.int64)
+    bit = v.copy()
+    x = 9 + short
+    width = w[rows, np.minimum(x, 42)]
+    _err(err, (width <= 222) | (width >= 1555), BADBLOCK)
+    short = width < 1111
+    bit ^= ~short
+    x += 1 + short
+    v = (v << 1) | bit
+    for _ in range(15):
+        _err(err, x > counts - 2, BADBLOCK)
+        width = w[rows, np.minimum(x, 42)]  # width is 444/889 nominal
+        _err(err, (width <= 222) | (width >= 1111), BADBLOCK)
+        short = width < 666
+        bit ^= ~short
+        v = (v << 1) | bit
+        x += 1 + short
+    return _result(t, starts, err, v & 0xFF, (v >> 8) & 0xFF, (v >> 16) & 1)
+
+
+def mce(times, init_cs=4, gap=5000):
+    """MCE rules. init_cs as MCE.init_cs: -1 skips the checksum."""
+    t, starts, counts = _bursts(times, gap)
+    w = _widths(t, starts, counts, 34)
+    m = len(starts)
+    rows = np.arange(m)
+    err = np.zeros(m, np.int64)
+    t0, t1 = w[:, 0], w[:, 1]  # 2000μs mark, 1000μs space
+    _err(err, ~((1800 < t0) & (t0 < 2200) & (800 < t1) & (t1 < 1200)), BADSTART)
+    _err(err, (counts < 14) | (counts > 34), np.where(counts > 34, OVERRUN, BADSTART))
+    bit = np.ones(m, np.int64)
+    v = np.zeros(m, np.int64)
+    x = np.full(m, 2, np.int64)
+    for n in range(16):  # Manchester decode, LSB first
+        _err(err, x > counts - 2, BADBLOCK)
+        width = w[rows, np.minimum(x, 32)]  # width is 500/1000 nominal
+        _err(err, (width <= 250) | (width >= 1350), BADBLOCK)
+        short = (width < 750).astype(np.int64)
+        bit ^= short ^ 1
+        v |= bit << n
+        x += 1 + short
+    if init_cs != -1:
+        ones = ((v[:, None] >> np.arange(12)) & 1).sum(axis=1)
+        _err(err, ((ones + init_cs) & 0xF) != v >> 12, BADDATA)  # 4 bit checksum wraps
+    return _result(t, starts, err, (v >> 6) & 0x3F, v & 0xF, (v >> 4) & 3)
+
+
+DECODERS = {
+    "nec": nec,
+    "nec8": lambda times: nec(times, extended=False),
+    "samsung": samsung,
+    "sony": sony,
+    "rc5": rc5,
+    "rc6": rc6,
+    "mce": mce,
+}
+
+
+def load(fn):
+    if fn.endswith(".npy"):
+        return np.load(fn)
+    with open(fn) as f:
+        return np.array(f.read().replace(",", " ").split(), dtype=np.int64)
+
+
+def main():
+    if len(sys.argv) != 3 or sys.argv[1] not in DECODERS:
+        sys.exit("Usage: ir_offline.py {} file".format("|".join(DECODERS)))
+    times = unwrap(load(sys.argv[2]))
+    t = time.perf_counter()
+    t0, data, addr, ctrl = DECODERS[sys.argv[1]](times)
+    dt = time.perf_counter() - t
+    for row in zip(t0, data, addr, ctrl):
+        print("{:12d} {:4d} 0x{:04x} {:3d}".format(*row))
+    print("{} bursts, {} errors in {:.3f}s".format(len(t0), np.count_nonzero(data < 0), dt), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
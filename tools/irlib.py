@@ -0,0 +1,45 @@
+# irlib.py Build and export IR code library files.
+# Runs under CPython on the PC.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# The source is a JSON file {device: {button: code}} where a code is a Pronto
+# hex string, a raw timing string or list, or a dict (see ir_tx/pronto.py).
+# $ python3 tools/irlib.py build codes.json codes.irl
+# $ python3 tools/irlib.py export codes.irl  # Print as Pronto hex JSON
+# $ python3 tools/irlib.py list codes.irl
+# Copy the .irl file to the target and send codes with ir_tx.library.LIBRARY.
+
+import argparse
+import json
+
+import irsim  # Allows ir_tx to be imported under CPython
+from ir_tx import pronto
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IR code library tool")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("build", help="Compile a JSON source to a library file")
+    p.add_argument("src")
+    p.add_argument("dest")
+    p = sub.add_parser("export", help="Print a library file as Pronto hex JSON")
+    p.add_argument("lib")
+    p = sub.add_parser("list", help="List the devices and buttons in a library file")
+    p.add_argument("lib")
+    args = parser.parse_args()
+    if args.cmd == "build":
+        with open(args.src) as f:
+            pronto.build(json.load(f), args.dest)
+    else:
+        codes = pronto.export(args.lib)
+        if args.cmd == "export":
+            print(json.dumps(codes, indent=1))
+        else:
+            for dev, buttons in codes.items():
+                print("{}: {}".format(dev, " ".join(buttons)))
+
+
+if __name__ == "__main__":
+    main()
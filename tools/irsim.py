@@ -0,0 +1,210 @@
+# irsim.py Run the ir_rx decoders and ir_tx encoders under CPython.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# Importing this module installs minimal stand-ins for the MicroPython modules
+# used by the drivers (machine, pyb, utime, micropython). These provide just
+# enough for the classes to be instantiated: no hardware is driven. Encoders
+# are run by calling .tx() to populate the array of mark and space times.
+# Decoders are run by writing edge times to ._times and calling .decode(), as
+# the pin interrupt and block timer would on a target.
+
+import os
+import sys
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+TICKS_PERIOD = 1 << 30  # As per the ports' ticks_us()
+_TICKS_MAX = TICKS_PERIOD - 1
+_TICKS_HALF = TICKS_PERIOD // 2
+
+
+def ticks_us():
+    return time.perf_counter_ns() // 1000 & _TICKS_MAX
+
+
+def ticks_ms():
+    return time.perf_counter_ns() // 1_000_000 & _TICKS_MAX
+
+
+def ticks_diff(a, b):
+    return ((a - b + _TICKS_HALF) & _TICKS_MAX) - _TICKS_HALF
+
+
+def ticks_add(a, b):
+    return (a + b) & _TICKS_MAX
+
+
+class _Hardware:  # Stands in for Pin, Timer, timer channel
+    IN = OUT = PULL_UP = 0
+    IRQ_FALLING = 1
+    IRQ_RISING = 2
+    ONE_SHOT = 0
+    PERIODIC = 1
+    PWM = 0
+
+    def __init__(self, *_, **__):
+        pass
+
+    def __call__(self, *_):
+        return 1
+
+    def value(self, *_):  # An idle receiver pin is high
+        return 1
+
+    def irq(self, *_, **__):
+        pass
+
+    def init(self, *_, **__):
+        pass
+
+    def deinit(self):
+        pass
+
+    def channel(self, *_, **__):
+        return self
+
+    def freq(self, *_):
+        pass
+
+    def pulse_width_percent(self, *_):
+        pass
+
+
+def _install():
+    if sys.implementation.name == "micropython":
+        return
+    utime = types.ModuleType("utime")
+    for name in ("ticks_us", "ticks_ms", "ticks_diff", "ticks_add"):
+        setattr(utime, name, globals()[name])
+        setattr(time, name, globals()[name])  # ir_tx imports from time
+    utime.sleep_ms = time.sleep_ms = lambda _: None
+    machine = types.ModuleType("machine")
+    machine.Pin = machine.Timer = machine.PWM = _Hardware
+    machine.freq = lambda *_: 160_000_000
+    machine.lightsleep = lambda *_: None
+    machine.disable_irq = lambda: 0
+    machine.enable_irq = lambda _: None
+    pyb = types.ModuleType("pyb")
+    pyb.Pin = pyb.Timer = pyb.LED = _Hardware
+    micropython = types.ModuleType("micropython")
+    micropython.const = lambda x: x
+    micropython.schedule = lambda f, a: f(a)
+    for mod in (utime, machine, pyb, micropython):
+        sys.modules.setdefault(mod.__name__, mod)
+
+
+_install()
+
+from ir_tx.nec import NEC
+from ir_tx.sony import SONY_12, SONY_15, SONY_20
+from ir_tx.philips import RC5, RC6_M0, RC6_M6A
+from ir_tx.mce import MCE
+from ir_tx.kaseikyo import KASEIKYO
+from ir_tx.jvc import JVC
+from ir_tx.sharp import SHARP, DENON
+import ir_rx.nec
+import ir_rx.sony
+import ir_rx.philips
+import ir_rx.mce
+import ir_rx.kaseikyo
+import ir_rx.jvc
+import ir_rx.sharp
+
+
+class SAMSUNG(NEC):
+    samsung = True
+
+
+# NEC 16 bit addresses: the receiver returns 8 bits if the high byte happens
+# to be the complement of the low byte.
+def _nec_addr(addr):
+    return addr & 0xFF if addr > 0xFF and (addr >> 8) == (addr & 0xFF) ^ 0xFF else addr
+
+
+# Name: (encoder, decoder, (max addr, data, toggle), expected decoder output)
+PROTOCOLS = {
+    "nec8": (NEC, ir_rx.nec.NEC_8, (0xFF, 0xFF, 0), lambda a, d, t: (d, a, 0)),
+    "nec16": (NEC, ir_rx.nec.NEC_16, (0xFFFF, 0xFF, 0), lambda a, d, t: (d, _nec_addr(a), 0)),
+    "samsung": (SAMSUNG, ir_rx.nec.SAMSUNG, (0xFF, 0xFF, 0), lambda a, d, t: (d, a | a << 8, 0)),
+    "sony12": (SONY_12, ir_rx.sony.SONY_12, (0x1F, 0x7F, 0), lambda a, d, t: (d, a, 0)),
+    "sony15": (SONY_15, ir_rx.sony.SONY_15, (0xFF, 0x7F, 0), lambda a, d, t: (d, a, 0)),
+    "sony20": (SONY_20, ir_rx.sony.SONY_20, (0x1F, 0x7F, 0xFF), lambda a, d, t: (d, a, t)),
+    "rc5": (RC5, ir_rx.philips.RC5_IR, (0x1F, 0x7F, 1), lambda a, d, t: (d, a, t)),
+    "rc6": (RC6_M0, ir_rx.philips.RC6_M0, (0xFF, 0xFF, 1), lambda a, d, t: (d, a, t)),
+    "mce": (MCE, ir_rx.mce.MCE, (0xF, 0x3F, 3), lambda a, d, t: (d, a, t)),
+    "rc6a": (RC6_M6A, ir_rx.philips.RC6_M6A, (0xFFFF, 0x7FFF, 1), lambda a, d, t: (d, a, t)),
+    "kaseikyo": (KASEIKYO, ir_rx.kaseikyo.KASEIKYO, (0xFFF, 0xFF, 0), lambda a, d, t: (d, a, KASEIKYO.vendor)),
+    "jvc": (JVC, ir_rx.jvc.JVC, (0xFF, 0xFF, 0), lambda a, d, t: (d, a, 0)),
+    "sharp": (SHARP, ir_rx.sharp.SHARP, (0x1F, 0xFF, 0), lambda a, d, t: (d, a, 0)),
+    "denon": (DENON, ir_rx.sharp.DENON, (0x1F, 0xFF, 0), lambda a, d, t: (d, a, 0)),
+}
+
+_encoders = {}
+_decoders = {}
+
+
+def encode(proto, addr, data, toggle=0):
+    """Return the list of mark and space times (μs) sent by the encoder."""
+    ir = _encoders.get(proto)
+    if ir is None:
+        ir = _encoders[proto] = PROTOCOLS[proto][0](_Hardware())
+    ir.aptr = 0
+    ir.carrier = False
+    ir.tx(addr, data, toggle)
+    return list(ir._arr[: ir.aptr])
+
+
+def edges(periods, t0=0):
+    """Convert mark and space times to edge times. A trailing space has no
+    terminating edge so it is discarded."""
+    t = [t0]
+    n = len(periods) if len(periods) & 1 else len(periods) - 1
+    for p in periods[:n]:
+        t0 += p
+        t.append(t0)
+    return t
+
+
+class Decoder:
+    def __init__(self, proto):
+        self.result = None
+        self.rx = PROTOCOLS[proto][1](_Hardware(), self._cb)
+        self.rx.error_function(self._err)
+
+    def _cb(self, data, addr, ctrl):
+        self.result = (data, addr, ctrl)
+
+    def _err(self, code):
+        self.result = (code, 0, 0)
+
+    # Store edges as the pin interrupt would: surplus edges are ignored.
+    def __call__(self, times):
+        rx = self.rx
+        nmax = rx._nedges
+        for t in times:
+            if rx.edge > nmax:
+                break
+            rx._times[rx.edge] = t & _TICKS_MAX
+            rx.edge += 1
+        self.result = None
+        rx.decode(None)
+        return self.result
+
+
+def decoder(proto):
+    """Return a callable taking a list of edge times and returning the decoded
+    (data, addr, ctrl) tuple. Errors are returned as (code, 0, 0)."""
+    dec = _decoders.get(proto)
+    if dec is None:
+        dec = _decoders[proto] = Decoder(proto)
+    return dec
+
+
+def expected(proto, addr, data, toggle=0):
+    return PROTOCOLS[proto][3](addr, data, toggle)
@@ -0,0 +1,79 @@
+# loopback.py Error rate of ir_rx decoders versus timing error.
+# Runs under CPython on the PC.
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# Each ir_tx encoder produces a list of mark and space times. These are
+# distorted as a real receiver chip and target would distort them, converted to
+# edge times and passed to the matching ir_rx decoder. Distortions:
+# Carrier detector lag: the chip's output lags the end of each mark by more
+# than it lags the start, so marks lengthen and spaces shorten by --lag μs.
+# Jitter: each mark and space changes by a random amount in +-jitter μs.
+# ISR latency: each edge is timestamped late by a random 0..--latency μs.
+# A burst is in error if it does not decode to the value sent. The error rate
+# (%) is printed for each protocol at each jitter value, e.g.
+# $ python3 tools/loopback.py --lag 60 --latency 40 --jitter 0 50 100 150 200
+# The last column is the largest jitter (in steps of --step μs) at which no
+# errors occurred: the timing margin of the decoder.
+
+import argparse
+import random
+
+import irsim
+
+
+def distort(periods, rng, jitter=0, lag=0, latency=0, t0=0):
+    """Return the edge times of a burst as seen by a receiver's pin ISR."""
+    p = []
+    for n, x in enumerate(periods):
+        x += lag if n & 1 == 0 else -lag  # Even entries are marks
+        if jitter:
+            x += rng.randint(-jitter, jitter)
+        p.append(max(x, 1))
+    times = irsim.edges(p, t0)
+    if latency:
+        times = [t + rng.randint(0, latency) for t in times]
+    return times
+
+
+def error_rate(proto, n, rng, **kwargs):
+    dec = irsim.decoder(proto)
+    errors = 0
+    for _ in range(n):
+        addr, data, tog = [rng.randint(0, m) for m in irsim.PROTOCOLS[proto][2]]
+        periods = irsim.encode(proto, addr, data, tog)
+        t0 = rng.randrange(irsim.TICKS_PERIOD)
+        if dec(distort(periods, rng, t0=t0, **kwargs)) != irsim.expected(proto, addr, data, tog):
+            errors += 1
+    return 100 * errors / n
+
+
+def margin(proto, n, rng, step, lag, latency):
+    jitter = 0
+    while jitter < 2000 and not error_rate(proto, n, rng, jitter=jitter + step, lag=lag, latency=latency):
+        jitter += step
+    return jitter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decoder error rate versus timing error")
+    parser.add_argument("-n", type=int, default=500, help="Bursts per point")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    parser.add_argument("--jitter", type=int, nargs="+", default=[0, 50, 100, 150, 200, 250, 300])
+    parser.add_argument("--lag", type=int, default=0, help="Carrier detector lag μs")
+    parser.add_argument("--latency", type=int, default=0, help="Max ISR latency μs")
+    parser.add_argument("--step", type=int, default=10, help="Resolution of margin μs")
+    parser.add_argument("protocols", nargs="*", default=list(irsim.PROTOCOLS))
+    args = parser.parse_args()
+    print("Error rate % (lag {}μs, latency {}μs)".format(args.lag, args.latency))
+    print("jitter  " + "".join("{:>7d}".format(j) for j in args.jitter) + "  margin")
+    for proto in args.protocols:
+        rng = random.Random("{}{}".format(args.seed, proto))
+        rates = [error_rate(proto, args.n, rng, jitter=j, lag=args.lag, latency=args.latency) for j in args.jitter]
+        m = margin(proto, args.n, rng, args.step, args.lag, args.latency)
+        print("{:8s}".format(proto) + "".join("{:7.1f}".format(r) for r in rates) + "{:6d}μs".format(m))
+
+
+if __name__ == "__main__":
+    main()
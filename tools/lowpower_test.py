@@ -0,0 +1,73 @@
+# lowpower_test.py Key events of ir_rx.lowpower.LOWPOWER under CPython.
+# Runs on the PC: $ python3 tools/lowpower_test.py
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# Light sleep is replaced by a function which, like the pin interrupt, records
+# the edges of a burst received while asleep, or which returns at once as if the
+# sleep timed out. A wake without a burst must not release a held key before
+# release_ms has elapsed since its last frame.
+
+import sys
+import time
+
+import irsim
+from irsim import ticks_us, ticks_diff
+import ir_rx.lowpower
+from ir_rx.lowpower import LOWPOWER
+from ir_rx.nec import NEC_16
+
+FRAME = irsim.encode("nec16", 0x1234, 0x56)
+REPEAT = [9000, 2250, 563]
+
+
+class Sleeper:  # Stands in for machine.lightsleep
+    def __init__(self, rx):
+        self.rx = rx
+        self.burst = None  # Periods of a burst to receive while asleep
+        self.timeout = None  # Arg of the last call
+
+    def __call__(self, ms=0):
+        self.timeout = ms
+        if self.burst is not None:
+            rx = self.rx
+            t0 = ticks_us() - sum(self.burst) - 1000  # Burst has just ended
+            for t in irsim.edges(self.burst, t0):
+                rx._times[rx.edge] = t & irsim._TICKS_MAX
+                rx.edge += 1
+            self.burst = None
+
+
+def test():
+    events = []
+    rx = NEC_16(irsim._Hardware(), lambda *_: None)
+    rx.key_function(lambda event, *_: events.append(event))
+    sleeper = Sleeper(rx)
+    ir_rx.lowpower.lightsleep = sleeper
+    lp = LOWPOWER(rx)
+    fail = 0
+
+    def expect(name, cond):
+        nonlocal fail
+        print("{:40s} {}".format(name, "OK" if cond else "FAIL"))
+        fail += not cond
+
+    sleeper.burst = FRAME
+    expect("Frame decoded", lp.sleep() and events == [rx.PRESS])
+    t = ticks_us()
+    expect("Held key: no burst", not lp.sleep())
+    expect("Held key: sleep limited by release_ms", 0 < sleeper.timeout <= rx.release_ms + 1)
+    expect("Short timeout: no burst", not lp.sleep(30))
+    if ticks_diff(ticks_us(), t) < rx.release_ms * 1000:  # Only valid if the host was not slow
+        expect("Short timeouts: key still held", events == [rx.PRESS])
+    sleeper.burst = REPEAT
+    expect("Repeat code is a hold", lp.sleep() and events == [rx.PRESS, rx.HOLD])
+    time.sleep((rx.release_ms + 10) / 1000)
+    expect("Timeout after release_ms: released", not lp.sleep(30) and events[-1] == rx.RELEASE)
+    return not fail
+
+
+if __name__ == "__main__":
+    if not test():
+        sys.exit(1)
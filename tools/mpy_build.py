@@ -0,0 +1,65 @@
+# mpy_build.py Cross-compile the ir_rx and ir_tx packages to .mpy files.
+# Runs under CPython on the PC. Requires mpy-cross (pip install mpy-cross).
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# Usage:
+# $ python3 tools/mpy_build.py [-march=armv6m] [-o build]
+# Output mirrors the package layout, e.g. build/ir_rx/nec.mpy. Copy it to the
+# target with
+# $ mpremote cp -r build/irbits.mpy build/ir_rx build/ir_tx :
+# then check RAM use with
+# $ mpremote run tools/ramtest.py
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGES = ("ir_rx", "ir_tx")
+MODULES = ("irbits.py",)  # Shared by both packages
+
+
+def build_one(src, out, name, march, opt):  # name: relative path of the source
+    mpy = os.path.join(out, name[:-3] + ".mpy")
+    cmd = ["mpy-cross", "-o", mpy, "-s", name]
+    if march:
+        cmd.append("-march={}".format(march))
+    if opt is not None:
+        cmd.append("-O{}".format(opt))
+    cmd.append(os.path.join(src, name))
+    subprocess.run(cmd, check=True)
+    size = os.path.getsize(mpy)
+    print("{:24s} {:6d}".format(name[:-3] + ".mpy", size))
+    return size
+
+
+def build(dest, march=None, opt=None):
+    total = 0
+    os.makedirs(dest, exist_ok=True)
+    for fn in MODULES:
+        total += build_one(ROOT, dest, fn, march, opt)
+    for pkg in PACKAGES:
+        os.makedirs(os.path.join(dest, pkg), exist_ok=True)
+        for fn in sorted(os.listdir(os.path.join(ROOT, pkg))):
+            if fn.endswith(".py"):
+                total += build_one(ROOT, dest, "{}/{}".format(pkg, fn), march, opt)
+    print("{:24s} {:6d}".format("Total", total))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-compile ir_rx and ir_tx to .mpy")
+    parser.add_argument("-march", help="Target architecture e.g. armv6m, armv7emsp, xtensawin")
+    parser.add_argument("-O", dest="opt", type=int, help="Optimisation level")
+    parser.add_argument("-o", dest="dest", default=os.path.join(ROOT, "build"), help="Output directory")
+    args = parser.parse_args()
+    try:
+        build(args.dest, args.march, args.opt)
+    except FileNotFoundError:
+        sys.exit("mpy-cross not found: pip install mpy-cross")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# ramtest.py RAM budget check for ir_rx and ir_tx classes.
+# Runs on the target. Install the packages (as .py, .mpy or frozen) then issue
+# $ mpremote run tools/ramtest.py
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# For each protocol module reports the heap consumed by the import and, for
+# each class, the heap consumed by instantiation. Raises an exception if any
+# class exceeds its budget. Budgets are in bytes of heap after gc.collect().
+
+from sys import platform
+import gc
+
+# Budgets: edit these to suit the product. Import costs vary greatly depending
+# on whether modules are frozen, so only instantiation is checked.
+RX_BUDGET = 1024  # Default for a receiver instance
+TX_BUDGET = 1024  # Default for a transmitter instance
+BUDGET = {}  # Per-class overrides e.g. {"ir_rx.nec.NEC_8": 800}
+
+RX = (
+    ("ir_rx.nec", ("NEC_8", "NEC_16", "SAMSUNG")),
+    ("ir_rx.sony", ("SONY_12", "SONY_15", "SONY_20")),
+    ("ir_rx.philips", ("RC5_IR", "RC6_M0", "RC6_M6A")),
+    ("ir_rx.mce", ("MCE",)),
+    ("ir_rx.kaseikyo", ("KASEIKYO",)),
+    ("ir_rx.jvc", ("JVC",)),
+    ("ir_rx.sharp", ("SHARP", "DENON")),
+)
+
+TX = (
+    ("ir_tx.nec", ("NEC",)),
+    ("ir_tx.sony", ("SONY_12", "SONY_15", "SONY_20")),
+    ("ir_tx.philips", ("RC5", "RC6_M0", "RC6_M6A")),
+    ("ir_tx.mce", ("MCE",)),
+    ("ir_tx.kaseikyo", ("KASEIKYO",)),
+    ("ir_tx.jvc", ("JVC",)),
+    ("ir_tx.sharp", ("SHARP", "DENON")),
+    ("ir_tx.ac", ("DAIKIN", "MITSUBISHI_AC", "GREE")),
+    ("ir_tx.stream", ("STREAM",)),
+)
+
+# Pins as per the test scripts
+if platform == "pyboard":
+    from pyb import Pin
+
+    rx_pin = lambda: Pin("X3", Pin.IN)
+    tx_pin = lambda: Pin("X1")
+elif platform == "esp8266":
+    from machine import Pin
+
+    rx_pin = lambda: Pin(13, Pin.IN)
+    tx_pin = None  # Transmitter is unsupported
+elif platform == "esp32" or platform == "esp32_LoBo":
+    from machine import Pin
+
+    rx_pin = lambda: Pin(23, Pin.IN)
+    tx_pin = lambda: Pin(23, Pin.OUT, value=0)
+elif platform == "rp2":
+    from machine import Pin
+
+    rx_pin = lambda: Pin(16, Pin.IN)
+    tx_pin = lambda: Pin(17, Pin.OUT, value=0)
+
+
+def used():
+    gc.collect()
+    return gc.mem_free()
+
+
+def module(name):
+    f = used()
+    mod = __import__(name)
+    for part in name.split(".")[1:]:
+        mod = getattr(mod, part)
+    return mod, f - used()
+
+
+def run(table, mkpin, default, cb):
+    over = []
+    for modname, classes in table:
+        mod, imp = module(modname)
+        print("{:16s} import {:6d}".format(modname, imp))
+        for clsname in classes:
+            cls = getattr(mod, clsname)
+            pin = mkpin()
+            f = used()
+            obj = cls(pin, cb) if cb else cls(pin)
+            cost = f - used()
+            qname = "{}.{}".format(modname, clsname)  # rx and tx names coincide
+            budget = BUDGET.get(qname, default)
+            print("  {:14s} instance {:6d} budget {:6d}{}".format(clsname, cost, budget, " OVER" if cost > budget else ""))
+            if cost > budget:
+                over.append(qname)
+            if cb:
+                obj.close()
+            else:
+                obj.deinit()  # Free PWM, timers, RMT or PIO for the next class
+            obj = None
+    return over
+
+
+def test():
+    gc.collect()
+    print("Heap free at start", gc.mem_free())
+    _, imp = module("ir_rx")
+    print("{:16s} import {:6d}".format("ir_rx", imp))
+    over = run(RX, rx_pin, RX_BUDGET, lambda *_: None)
+    if tx_pin is not None:
+        _, imp = module("ir_tx")
+        print("{:16s} import {:6d}".format("ir_tx", imp))
+        over += run(TX, tx_pin, TX_BUDGET, None)
+    if over:
+        raise MemoryError("Over budget: {}".format(", ".join(over)))
+    print("All classes within budget.")
+
+
+test()
@@ -0,0 +1,63 @@
+# timerbench.py Latency of receiver block timer strategies.
+# Runs on the target. Install ir_rx then issue
+# $ mpremote run tools/timerbench.py
+
+# Author: Peter Hinch
+# Copyright Peter Hinch 2020-2024 Released under the MIT license
+
+# For each strategy available on the port (software timer, then each hardware
+# timer that ir_rx.timers can allocate) a one-shot timer is started repeatedly
+# and the lateness of its callback measured, as seen by a receiver's decode.
+# Each test is run idle and while the main loop allocates, provoking GC.
+# Results are in μs: mean, worst.
+
+from machine import Timer
+from utime import ticks_us, ticks_diff, sleep_ms
+from array import array
+from ir_rx import timers
+
+PERIOD = 20  # ms: similar to a receiver's block time
+N = 50  # Samples per test
+
+lat = array("i", (0 for _ in range(N)))
+idx = 0
+t0 = 0
+
+
+def cb(_):
+    global idx
+    if idx < N:
+        lat[idx] = ticks_diff(ticks_us(), t0) - PERIOD * 1000
+        idx += 1
+
+
+def run(tim, load):
+    global idx, t0
+    idx = 0
+    junk = None
+    for _ in range(N):
+        n = idx
+        t0 = ticks_us()
+        tim.init(period=PERIOD, mode=Timer.ONE_SHOT, callback=cb)
+        while idx == n:
+            if load:
+                junk = [x for x in range(20)]  # Allocate
+        sleep_ms(2)
+    tim.deinit()
+    return sum(lat) // N, max(lat)
+
+
+def test():
+    strategies = [("soft", -1)] + [("hard {}".format(n), n) for n in timers.HARD]
+    print("{:10s} {:>14s} {:>14s}".format("Timer", "idle", "allocating"))
+    for name, tid in strategies:
+        try:
+            tim = timers.get(tid)
+        except (ValueError, OSError):
+            continue  # Not available on this chip
+        idle = run(tim, False)
+        busy = run(tim, True)
+        print("{:10s} {:6d} {:6d}μs  {:6d} {:6d}μs".format(name, *idle, *busy))
+
+
+test()